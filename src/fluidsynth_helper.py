@@ -3,74 +3,155 @@
 Helper module for working with FluidSynth
 """
 
+import atexit
+import io
 import os
+import re
 import platform
 import shutil
 import subprocess
 import tempfile
-import shlex
 import sys
-from typing import Optional, Tuple, List
+import threading
+import time
+import wave
+import multiprocessing
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from typing import Optional, Tuple, List, Dict, Any, Iterator, Union, BinaryIO
 
-from sound_test import play_wav_simple
+__all__ = [
+    'detect_audio_driver',
+    'find_fluidsynth_executable',
+    'check_fluidsynth_version',
+    'FluidSynthServer',
+    'play_soundfont',
+    'render_midi_to_wav',
+    'render_midi_to_wav_batch',
+    'get_available_audio_drivers',
+    'run_fluidsynth',
+    'install_instructions',
+]
 
-def detect_audio_driver() -> str:
+# pyfluidsynth is optional: when available, playback and rendering run
+# in-process instead of launching a FluidSynth subprocess per call
+try:
+    import fluidsynth
+except ImportError:
+    fluidsynth = None
+
+# Loaded synths keyed by (soundfont_path, sample_rate, gain, audio_driver),
+# least recently used first; audio_driver is None for offline rendering synths.
+# Each entry holds a whole SF2 in memory (live ones also an open audio driver),
+# so only the last _SYNTH_CACHE_SIZE are kept and evicted synths are deleted.
+_SYNTH_CACHE: "OrderedDict[Tuple[str, int, float, Optional[str]], Dict[str, Any]]" = OrderedDict()
+_SYNTH_CACHE_SIZE = 2
+
+# pyfluidsynth synths are not thread-safe: every use of a cached synth (and any
+# change to the cache) happens while holding this lock
+_SYNTH_LOCK = threading.RLock()
+
+# Seconds rendered after the MIDI player stops, for the release/reverb tail
+# that the FluidSynth executable also renders
+_RENDER_TAIL = 1.0
+
+# fluid_player_status value while a MIDI file is still being played
+_FLUID_PLAYER_PLAYING = 1
+
+# Number of frames rendered per get_samples() call
+_RENDER_BLOCK_SIZE = 1024
+
+# Read size used when priming the page cache with an SF2 file
+_PRELOAD_CHUNK_SIZE = 1024 * 1024
+
+# Shared null device for discarded subprocess output, opened once instead of
+# once per subprocess.run(..., stdout=_DEVNULL_FD) call
+_DEVNULL_FD = os.open(os.devnull, os.O_WRONLY)
+atexit.register(os.close, _DEVNULL_FD)
+
+# The operating system doesn't change during the process lifetime
+_SYSTEM = platform.system().lower()
+
+# FluidSynth executable path, resolved once on first use
+_FLUIDSYNTH_PATH: Optional[str] = None
+
+# Matches "name: description" driver lines in the output of `fluidsynth -a help`
+_DRIVER_RE = re.compile(r'^\s*([A-Za-z0-9_+-]+)\s*:', re.M)
+
+def _detect_linux_audio_driver() -> str:
     """
-    Detect the best audio driver for the current system.
+    Detect the best audio driver on Linux.
     
     Returns:
         Name of the audio driver to use
     """
-    system = platform.system().lower()
+    # Check if pulseaudio is running
+    try:
+        result = subprocess.run(
+            ['pulseaudio', '--check'], 
+            stdout=_DEVNULL_FD, 
+            stderr=_DEVNULL_FD
+        )
+        if result.returncode == 0:
+            return 'pulseaudio'
+    except:
+        pass
     
-    if system == 'linux':
-        # Check if pulseaudio is running
-        try:
-            result = subprocess.run(
-                ['pulseaudio', '--check'], 
-                stdout=subprocess.DEVNULL, 
-                stderr=subprocess.DEVNULL
-            )
-            if result.returncode == 0:
-                return 'pulseaudio'
-        except:
-            pass
-        
-        # Check if pipewire is running
-        try:
-            result = subprocess.run(
-                ['pidof', 'pipewire'], 
-                stdout=subprocess.DEVNULL, 
-                stderr=subprocess.DEVNULL
-            )
-            if result.returncode == 0:
-                return 'pulseaudio'  # pipewire often uses pulseaudio compat
-        except:
-            pass
-        
-        # Default to alsa on Linux
-        return 'alsa'
-    elif system == 'darwin':
-        return 'coreaudio'
-    elif system == 'windows':
-        # Windows can use different drivers
-        try:
-            # Check if wasapi is available (Windows 7+)
-            result = subprocess.run(
-                ['fluidsynth', '-a', 'wasapi', '--help'], 
-                stdout=subprocess.DEVNULL, 
-                stderr=subprocess.DEVNULL
-            )
-            if result.returncode == 0:
-                return 'wasapi'
-        except:
-            pass
-        
-        return 'dsound'  # DirectSound is the fallback
-    else:
-        # Safe default
-        return 'alsa'
+    # Check if pipewire is running
+    try:
+        result = subprocess.run(
+            ['pidof', 'pipewire'], 
+            stdout=_DEVNULL_FD, 
+            stderr=_DEVNULL_FD
+        )
+        if result.returncode == 0:
+            return 'pulseaudio'  # pipewire often uses pulseaudio compat
+    except:
+        pass
+    
+    # Default to alsa on Linux
+    return 'alsa'
+
+def _detect_darwin_audio_driver() -> str:
+    """macOS always uses CoreAudio."""
+    return 'coreaudio'
+
+def _detect_windows_audio_driver() -> str:
+    """
+    Detect the best audio driver on Windows.
+    
+    Returns:
+        Name of the audio driver to use
+    """
+    # Windows can use different drivers
+    try:
+        # Check if wasapi is available (Windows 7+)
+        result = subprocess.run(
+            ['fluidsynth', '-a', 'wasapi', '--help'], 
+            stdout=_DEVNULL_FD, 
+            stderr=_DEVNULL_FD
+        )
+        if result.returncode == 0:
+            return 'wasapi'
+    except:
+        pass
+    
+    return 'dsound'  # DirectSound is the fallback
+
+def _detect_default_audio_driver() -> str:
+    """Safe default for other systems."""
+    return 'alsa'
 
+# The platform never changes at runtime, so pick its detector once at import.
+# detect_audio_driver() returns the name of the best audio driver for this system.
+detect_audio_driver = lru_cache(maxsize=1)({
+    'linux': _detect_linux_audio_driver,
+    'darwin': _detect_darwin_audio_driver,
+    'windows': _detect_windows_audio_driver,
+}.get(_SYSTEM, _detect_default_audio_driver))
+
+@lru_cache(maxsize=1)
 def find_fluidsynth_executable() -> Optional[str]:
     """
     Find the FluidSynth executable in the system.
@@ -79,7 +160,7 @@ def find_fluidsynth_executable() -> Optional[str]:
         Path to FluidSynth executable or None if not found
     """
     # Check if fluidsynth is in PATH
-    system = platform.system().lower()
+    system = _SYSTEM
     
     # Define possible executable names
     if system == 'windows':
@@ -87,23 +168,11 @@ def find_fluidsynth_executable() -> Optional[str]:
     else:
         executable_names = ['fluidsynth']
     
-    # Check in PATH
+    # Check in PATH (shutil.which honors PATHEXT on Windows)
     for exec_name in executable_names:
-        try:
-            # Use 'where' on Windows, 'which' on Unix-like systems
-            find_cmd = 'where' if system == 'windows' else 'which'
-            result = subprocess.run(
-                [find_cmd, exec_name], 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE,
-                text=True
-            )
-            if result.returncode == 0:
-                path = result.stdout.strip()
-                if path:
-                    return path.splitlines()[0]  # Return the first match
-        except:
-            pass
+        path = shutil.which(exec_name)
+        if path:
+            return path
     
     # Check common installation locations
     common_locations = []
@@ -130,12 +199,36 @@ def find_fluidsynth_executable() -> Optional[str]:
             '/opt/bin/fluidsynth'
         ]
     
+    # List each candidate directory once instead of stat-ing every location
+    by_dir: Dict[str, List[str]] = defaultdict(list)
     for location in common_locations:
-        if os.path.isfile(location):
-            return location
+        by_dir[os.path.dirname(location)].append(location)
+    
+    for directory, locations in by_dir.items():
+        try:
+            with os.scandir(directory) as entries:
+                names = {os.path.normcase(entry.name) for entry in entries if entry.is_file()}
+        except OSError:
+            continue
+        
+        for location in locations:
+            if os.path.normcase(os.path.basename(location)) in names:
+                return location
     
     return None
 
+def _get_fs_path() -> Optional[str]:
+    """
+    Get the FluidSynth executable path, resolving it only on first use.
+    
+    Returns:
+        Path to FluidSynth executable or None if not found
+    """
+    global _FLUIDSYNTH_PATH
+    if _FLUIDSYNTH_PATH is None:
+        _FLUIDSYNTH_PATH = find_fluidsynth_executable()
+    return _FLUIDSYNTH_PATH
+
 def check_fluidsynth_version(executable: Optional[str] = None) -> Tuple[bool, Optional[str]]:
     """
     Check FluidSynth version.
@@ -147,7 +240,7 @@ def check_fluidsynth_version(executable: Optional[str] = None) -> Tuple[bool, Op
         Tuple of (success, version_string)
     """
     if not executable:
-        executable = find_fluidsynth_executable()
+        executable = _get_fs_path()
         if not executable:
             return False, None
     
@@ -166,13 +259,388 @@ def check_fluidsynth_version(executable: Optional[str] = None) -> Tuple[bool, Op
     except:
         return False, None
 
+def _prime_sf2_cache(soundfont_path: str) -> None:
+    """
+    Read an SF2 file sequentially so it is in the OS page cache before
+    FluidSynth loads it; on a cold cache and slow disks FluidSynth's random
+    sample reads can otherwise stall the render.
+    
+    Args:
+        soundfont_path: Path to the .sf2 file
+    """
+    try:
+        with open(soundfont_path, 'rb', buffering=0) as f:
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+            
+            chunk = bytearray(_PRELOAD_CHUNK_SIZE)
+            while f.readinto(chunk):
+                pass
+    except OSError:
+        # Priming is only an optimization; FluidSynth will read the file anyway
+        pass
+
+def _synth_key(
+    soundfont_path: str,
+    sample_rate: int,
+    gain: float,
+    audio_driver: Optional[str] = None
+) -> Tuple[str, int, float, Optional[str]]:
+    """Build the _SYNTH_CACHE key for a soundfont and synth configuration."""
+    return (os.path.abspath(soundfont_path), sample_rate, gain, audio_driver)
+
+def _get_cached_synth(
+    soundfont_path: str,
+    sample_rate: int,
+    gain: float,
+    audio_driver: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Get a pyfluidsynth synth with the soundfont loaded, reusing it between calls.
+    
+    Callers must hold _SYNTH_LOCK while they use the returned synth.
+    
+    Args:
+        soundfont_path: Path to the .sf2 file
+        sample_rate: Audio sample rate
+        gain: Audio gain (volume)
+        audio_driver: Audio driver to start (None for offline rendering)
+        
+    Returns:
+        Dictionary with the synth and the loaded soundfont ID
+    """
+    key = _synth_key(soundfont_path, sample_rate, gain, audio_driver)
+    with _SYNTH_LOCK:
+        entry = _SYNTH_CACHE.get(key)
+        if entry is not None:
+            _SYNTH_CACHE.move_to_end(key)
+            return entry
+        
+        synth = fluidsynth.Synth(gain=gain, samplerate=float(sample_rate))
+        if audio_driver is None:
+            # Offline rendering: let the player advance with the rendered samples
+            synth.setting('player.timing-source', 'sample')
+        else:
+            synth.start(driver=audio_driver)
+        
+        sfid = synth.sfload(soundfont_path)
+        if sfid == -1:
+            synth.delete()
+            raise RuntimeError(f"FluidSynth could not load soundfont: {soundfont_path}")
+        
+        entry = {"synth": synth, "sfid": sfid}
+        _SYNTH_CACHE[key] = entry
+        
+        # Free the least recently used synths (and their audio drivers)
+        while len(_SYNTH_CACHE) > _SYNTH_CACHE_SIZE:
+            _, evicted = _SYNTH_CACHE.popitem(last=False)
+            evicted["synth"].delete()
+        
+        return entry
+
+def _release_cached_synth(key: Tuple[str, int, float, Optional[str]]) -> None:
+    """Remove a synth from _SYNTH_CACHE and delete it (no-op if not cached)."""
+    with _SYNTH_LOCK:
+        entry = _SYNTH_CACHE.pop(key, None)
+        if entry is not None:
+            entry["synth"].delete()
+
+def _write_frames(synth: Any, wav: wave.Wave_write, num_frames: int) -> None:
+    """Render num_frames frames from the synth into an open WAV file."""
+    while num_frames > 0:
+        block = min(num_frames, _RENDER_BLOCK_SIZE)
+        wav.writeframes(fluidsynth.raw_audio_string(synth.get_samples(block)))
+        num_frames -= block
+
+def _player_is_playing(synth: Any) -> bool:
+    """Check whether the synth's MIDI player is still playing."""
+    return fluidsynth.fluid_player_get_status(synth.player) == _FLUID_PLAYER_PLAYING
+
+def _release_player(synth: Any) -> None:
+    """Stop and delete the synth's MIDI player (if any) and reset the synth for reuse."""
+    player = getattr(synth, "player", None)
+    if player is not None:
+        fluidsynth.fluid_player_stop(player)
+        fluidsynth.delete_fluid_player(player)
+        synth.player = None
+    synth.system_reset()
+
+def _play_in_process(
+    soundfont_path: str,
+    midi_file: str,
+    audio_driver: str,
+    gain: float,
+    sample_rate: int
+) -> bool:
+    """
+    Play a MIDI file with pyfluidsynth, without launching a subprocess.
+    
+    Returns:
+        True if playback was successful, False otherwise
+    """
+    with _SYNTH_LOCK:
+        synth = _get_cached_synth(soundfont_path, sample_rate, gain, audio_driver)["synth"]
+        
+        # The player is created even when the file can't be added to it
+        try:
+            if synth.play_midi_file(midi_file) != 0:
+                return False
+            
+            while _player_is_playing(synth):
+                time.sleep(0.1)
+        finally:
+            _release_player(synth)
+    
+    return True
+
+def _render_in_process(
+    soundfont_path: str,
+    midi_file: str,
+    output_wav: Union[str, BinaryIO],
+    gain: float,
+    sample_rate: int,
+    tail: float = _RENDER_TAIL
+) -> bool:
+    """
+    Render a MIDI file to WAV with pyfluidsynth, without launching a subprocess.
+    
+    Args:
+        output_wav: Path or binary file object (e.g. BytesIO) receiving the WAV data
+        tail: Seconds rendered after the player stops, for release/reverb
+        
+    Returns:
+        True if rendering was successful, False otherwise
+    """
+    with _SYNTH_LOCK:
+        synth = _get_cached_synth(soundfont_path, sample_rate, gain)["synth"]
+        
+        # The player is created even when the file can't be added to it
+        try:
+            if synth.play_midi_file(midi_file) != 0:
+                return False
+            
+            with wave.open(output_wav, 'wb') as wav:
+                wav.setnchannels(2)
+                wav.setsampwidth(2)  # 16-bit
+                wav.setframerate(sample_rate)
+                
+                while _player_is_playing(synth):
+                    samples = synth.get_samples(_RENDER_BLOCK_SIZE)
+                    wav.writeframes(fluidsynth.raw_audio_string(samples))
+                
+                # Notes released at the end of the file keep sounding for a while
+                _write_frames(synth, wav, int(tail * sample_rate))
+        finally:
+            _release_player(synth)
+    
+    return True
+
+def _render_to_buffer(
+    soundfont_path: str,
+    midi_file: str,
+    fluidsynth_path: Optional[str] = None,
+    gain: float = 0.7,
+    sample_rate: int = 44100
+) -> Optional[bytes]:
+    """
+    Render a MIDI file to WAV data in memory, without touching the disk.
+    
+    Args:
+        soundfont_path: Path to the .sf2 file
+        midi_file: Path to the MIDI file
+        fluidsynth_path: Path to FluidSynth executable (resolved once if None;
+                         used without pyfluidsynth)
+        gain: Audio gain (volume)
+        sample_rate: Audio sample rate
+        
+    Returns:
+        WAV file contents, or None if rendering failed
+    """
+    buffer = io.BytesIO()
+    
+    if fluidsynth is not None:
+        try:
+            if _render_in_process(soundfont_path, midi_file, buffer, gain, sample_rate):
+                return buffer.getvalue()
+        except Exception:
+            buffer = io.BytesIO()
+    
+    fluidsynth_path = fluidsynth_path or _get_fs_path()
+    if not fluidsynth_path:
+        return None
+    
+    # Raw 16-bit PCM on stdout ('-'); quiet so the banner doesn't mix with the audio
+    cmd = [
+        fluidsynth_path,
+        '-niq',
+        '-g', str(gain),
+        '-r', str(sample_rate),
+        '-T', 'raw',
+        '-O', 's16',
+        '-F', '-',
+        soundfont_path,
+        midi_file
+    ]
+    
+    try:
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=_DEVNULL_FD)
+    except Exception:
+        return None
+    
+    if result.returncode != 0 or not result.stdout:
+        return None
+    
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)  # 16-bit
+        wav.setframerate(sample_rate)
+        wav.writeframes(result.stdout)
+    
+    return buffer.getvalue()
+
+class FluidSynthServer:
+    """
+    Long-lived FluidSynth synth that keeps a soundfont loaded between renders.
+    
+    MIDI data goes straight into the synth - either a MIDI file handed to its
+    player or note events from memory - so repeated renders neither reload the
+    SF2 nor need temporary MIDI files. The synth is shared with
+    render_midi_to_wav, which reuses it while the server is open.
+    
+    Example:
+        with FluidSynthServer("piano.sf2") as server:
+            server.render("song.mid", "song.wav")
+            server.render_notes([{"note": 60, "start": 0.0, "end": 1.0, "velocity": 100}], "c4.wav")
+    """
+    
+    def __init__(self, soundfont_path: str, gain: float = 1.0, sample_rate: int = 44100):
+        """
+        Initialize the server.
+        
+        Args:
+            soundfont_path: Path to the .sf2 file
+            gain: Audio gain (volume) - default 1.0
+            sample_rate: Audio sample rate - default 44100
+        """
+        if fluidsynth is None:
+            raise RuntimeError("FluidSynthServer requires the pyfluidsynth package")
+        if not os.path.exists(soundfont_path):
+            raise FileNotFoundError(f"File not found: {soundfont_path}")
+        
+        self.soundfont_path = soundfont_path
+        self.gain = gain
+        self.sample_rate = sample_rate
+        self._started = False
+    
+    def __enter__(self) -> "FluidSynthServer":
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
+    def start(self) -> None:
+        """
+        Create the synth and load the soundfont.
+        
+        The synth lives in the shared synth cache; if it is evicted in the
+        meantime, the next render loads the soundfont again.
+        """
+        _get_cached_synth(self.soundfont_path, self.sample_rate, self.gain)
+        self._started = True
+    
+    def close(self) -> None:
+        """Release the synth and unload the soundfont."""
+        if not self._started:
+            return
+        
+        _release_cached_synth(_synth_key(self.soundfont_path, self.sample_rate, self.gain))
+        self._started = False
+    
+    def render(self, midi_file: str, output_wav: Union[str, BinaryIO]) -> bool:
+        """
+        Render a MIDI file to WAV with the loaded soundfont.
+        
+        Args:
+            midi_file: Path to the MIDI file
+            output_wav: Path or binary file object receiving the WAV data
+            
+        Returns:
+            True if rendering was successful, False otherwise
+        """
+        self._started = True
+        return _render_in_process(self.soundfont_path, midi_file, output_wav, self.gain, self.sample_rate)
+    
+    def render_notes(
+        self,
+        notes: List[Dict],
+        output_wav: Union[str, BinaryIO],
+        program: int = 0,
+        tail: float = 1.0
+    ) -> bool:
+        """
+        Render note events to WAV without writing a MIDI file.
+        
+        Args:
+            notes: List of dictionaries with "note", "start", "end" and "velocity"
+            output_wav: Path or binary file object receiving the WAV data
+            program: MIDI program (preset) to play the notes with
+            tail: Seconds rendered after the last event, for release/reverb
+            
+        Returns:
+            True if rendering was successful, False otherwise
+        """
+        # Note-offs sort before note-ons at the same instant (a repeated note
+        # restarts), so zero-length notes last at least one frame: otherwise
+        # their note-off would come first and they would sound until the reset
+        min_duration = 1.0 / self.sample_rate
+        events = []
+        for note_info in notes:
+            start = note_info["start"]
+            events.append((start, 1, note_info["note"], note_info.get("velocity", 100)))
+            events.append((max(note_info["end"], start + min_duration), 0, note_info["note"], 0))
+        events.sort(key=lambda event: (event[0], event[1]))
+        
+        with _SYNTH_LOCK:
+            entry = _get_cached_synth(self.soundfont_path, self.sample_rate, self.gain)
+            self._started = True
+            synth = entry["synth"]
+            synth.program_select(0, entry["sfid"], 0, program)
+            
+            try:
+                with wave.open(output_wav, 'wb') as wav:
+                    wav.setnchannels(2)
+                    wav.setsampwidth(2)  # 16-bit
+                    wav.setframerate(self.sample_rate)
+                    
+                    rendered = 0
+                    for time_s, is_note_on, note, velocity in events:
+                        target = int(time_s * self.sample_rate)
+                        _write_frames(synth, wav, target - rendered)
+                        rendered = max(rendered, target)
+                        
+                        if is_note_on:
+                            synth.noteon(0, note, velocity)
+                        else:
+                            synth.noteoff(0, note)
+                    
+                    _write_frames(synth, wav, int(tail * self.sample_rate))
+            finally:
+                synth.system_reset()
+        
+        return True
+
 def play_soundfont(
     soundfont_path: str, 
     midi_file: str, 
     audio_driver: Optional[str] = None, 
     gain: float = 1.0,
     sample_rate: int = 44100,
-    verbose: bool = False
+    verbose: bool = False,
+    use_subprocess: bool = False,
+    fluidsynth_path: Optional[str] = None,
+    preload: bool = False
 ) -> bool:
     """
     Play a MIDI file using a soundfont via FluidSynth.
@@ -184,17 +652,14 @@ def play_soundfont(
         gain: Audio gain (volume) - default 1.0
         sample_rate: Audio sample rate - default 44100
         verbose: If True, print detailed output
+        use_subprocess: If True, always run the FluidSynth executable instead
+                        of the in-process pyfluidsynth bindings
+        fluidsynth_path: Path to FluidSynth executable (resolved once if None)
+        preload: If True, read the soundfont into the page cache before loading it
         
     Returns:
         True if playback was successful, False otherwise
     """
-    # Find FluidSynth
-    fluidsynth_path = find_fluidsynth_executable()
-    if not fluidsynth_path:
-        if verbose:
-            print("Error: FluidSynth not found. Please install it or add it to your PATH.")
-        return False
-    
     # Check if files exist
     if not os.path.exists(soundfont_path):
         if verbose:
@@ -210,6 +675,24 @@ def play_soundfont(
     if audio_driver is None:
         audio_driver = detect_audio_driver()
     
+    if preload:
+        _prime_sf2_cache(soundfont_path)
+    
+    # Play in-process when pyfluidsynth is available
+    if fluidsynth is not None and not use_subprocess:
+        try:
+            return _play_in_process(soundfont_path, midi_file, audio_driver, gain, sample_rate)
+        except Exception as e:
+            if verbose:
+                print(f"pyfluidsynth playback failed, falling back to subprocess: {e}")
+    
+    # Find FluidSynth
+    fluidsynth_path = fluidsynth_path or _get_fs_path()
+    if not fluidsynth_path:
+        if verbose:
+            print("Error: FluidSynth not found. Please install it or add it to your PATH.")
+        return False
+    
     # Build command
     cmd = [
         fluidsynth_path,
@@ -234,8 +717,8 @@ def play_soundfont(
         else:
             result = subprocess.run(
                 cmd, 
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL
+                stdout=_DEVNULL_FD,
+                stderr=_DEVNULL_FD
             )
         return result.returncode == 0
     except Exception as e:
@@ -250,7 +733,11 @@ def render_midi_to_wav(
     audio_driver: Optional[str] = None, 
     gain: float = 1.0,
     sample_rate: int = 44100,
-    verbose: bool = False
+    verbose: bool = False,
+    use_subprocess: bool = False,
+    fluidsynth_path: Optional[str] = None,
+    preload: bool = False,
+    cpu_cores: Optional[int] = None
 ) -> bool:
     """
     Render a MIDI file to a WAV file using a soundfont via FluidSynth.
@@ -263,17 +750,17 @@ def render_midi_to_wav(
         gain: Audio gain (volume) - default 1.0
         sample_rate: Audio sample rate - default 44100
         verbose: If True, print detailed output
+        use_subprocess: If True, always run the FluidSynth executable instead
+                        of the in-process pyfluidsynth bindings
+        fluidsynth_path: Path to FluidSynth executable (resolved once if None)
+        preload: If True, read the soundfont into the page cache before loading it
+        cpu_cores: Number of FluidSynth rendering threads (default: half the CPUs);
+                   only used by the subprocess, the in-process synth renders
+                   with one thread
         
     Returns:
         True if rendering was successful, False otherwise
     """
-    # Find FluidSynth
-    fluidsynth_path = find_fluidsynth_executable()
-    if not fluidsynth_path:
-        if verbose:
-            print("Error: FluidSynth not found. Please install it or add it to your PATH.")
-        return False
-    
     # Check if files exist
     if not os.path.exists(soundfont_path):
         if verbose:
@@ -285,6 +772,28 @@ def render_midi_to_wav(
             print(f"Error: MIDI file not found: {midi_file}")
         return False
     
+    if preload:
+        _prime_sf2_cache(soundfont_path)
+    
+    # Render in-process when pyfluidsynth is available
+    if fluidsynth is not None and not use_subprocess:
+        try:
+            if (_render_in_process(soundfont_path, midi_file, output_wav, gain, sample_rate)
+                    and os.path.exists(output_wav) and os.path.getsize(output_wav) > 0):
+                return True
+            if verbose:
+                print("pyfluidsynth rendering produced no output, falling back to subprocess")
+        except Exception as e:
+            if verbose:
+                print(f"pyfluidsynth rendering failed, falling back to subprocess: {e}")
+    
+    # Find FluidSynth
+    fluidsynth_path = fluidsynth_path or _get_fs_path()
+    if not fluidsynth_path:
+        if verbose:
+            print("Error: FluidSynth not found. Please install it or add it to your PATH.")
+        return False
+    
     # Build command
     cmd = [
         fluidsynth_path,
@@ -292,6 +801,20 @@ def render_midi_to_wav(
         '-g', str(gain),           # Gain
         '-r', str(sample_rate),    # Sample rate
         '-F', output_wav,          # Output file
+        '-T', 'wav',               # Output file type
+        # Render as fast as the CPU allows instead of pacing to real time
+        '-o', 'player.timing-source=sample',
+        '-o', 'audio.realtime-prio=0',
+        '-o', 'synth.lock-memory=0',
+    ]
+    
+    # Let FluidSynth split voice rendering across worker threads
+    if cpu_cores is None:
+        cpu_cores = max(1, (os.cpu_count() or 1) // 2)
+    if cpu_cores > 1:
+        cmd += ['-o', f'synth.cpu-cores={cpu_cores}']
+    
+    cmd += [
         soundfont_path,            # Soundfont file
         midi_file                  # MIDI file
     ]
@@ -303,8 +826,8 @@ def render_midi_to_wav(
         else:
             result = subprocess.run(
                 cmd, 
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL
+                stdout=_DEVNULL_FD,
+                stderr=_DEVNULL_FD
             )
         
         if result.returncode != 0:
@@ -324,6 +847,56 @@ def render_midi_to_wav(
             print(f"Error rendering MIDI to WAV: {e}")
         return False
 
+def _render_job(job: Tuple[str, str, str], gain: float, sample_rate: int, cpu_cores: int) -> bool:
+    """Render a single (soundfont, midi, wav) job in a worker process."""
+    soundfont_path, midi_file, output_wav = job
+    return render_midi_to_wav(
+        soundfont_path, midi_file, output_wav,
+        gain=gain, sample_rate=sample_rate, cpu_cores=cpu_cores
+    )
+
+def render_midi_to_wav_batch(
+    jobs: List[Tuple[str, str, str]],
+    max_workers: Optional[int] = None,
+    gain: float = 1.0,
+    sample_rate: int = 44100,
+    cpu_cores: int = 1
+) -> Iterator[Tuple[Tuple[str, str, str], bool]]:
+    """
+    Render several MIDI files to WAV in parallel, one FluidSynth render per worker process.
+    
+    Args:
+        jobs: List of (soundfont_path, midi_file, output_wav) tuples
+        max_workers: Maximum number of worker processes (default: CPU count)
+        gain: Audio gain (volume) - default 1.0
+        sample_rate: Audio sample rate - default 44100
+        cpu_cores: FluidSynth rendering threads per job - default 1, since the
+                   jobs themselves already run in parallel (subprocess renders only)
+        
+    Yields:
+        Tuples of (job, success) in completion order
+    """
+    if not jobs:
+        return
+    
+    max_workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+    
+    # Forked workers inherit the already imported modules instead of re-importing them
+    mp_context = multiprocessing.get_context('fork') if _SYSTEM == 'linux' else None
+    
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context) as executor:
+        futures = {
+            executor.submit(_render_job, job, gain, sample_rate, cpu_cores): job
+            for job in jobs
+        }
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                success = future.result()
+            except Exception:
+                success = False
+            yield job, success
+
 def get_available_audio_drivers() -> List[str]:
     """
     Get list of available FluidSynth audio drivers.
@@ -331,12 +904,24 @@ def get_available_audio_drivers() -> List[str]:
     Returns:
         List of available audio driver names
     """
-    drivers = []
-    fluidsynth_path = find_fluidsynth_executable()
+    fluidsynth_path = _get_fs_path()
     
     if not fluidsynth_path:
         return []
     
+    return list(_query_audio_drivers(fluidsynth_path))
+
+@lru_cache(maxsize=None)
+def _query_audio_drivers(fluidsynth_path: str) -> Tuple[str, ...]:
+    """
+    Ask a FluidSynth executable for its audio drivers (memoized per executable).
+    
+    Args:
+        fluidsynth_path: Path to FluidSynth executable
+        
+    Returns:
+        Tuple of available audio driver names
+    """
     try:
         result = subprocess.run(
             [fluidsynth_path, '-a', 'help'], 
@@ -347,30 +932,27 @@ def get_available_audio_drivers() -> List[str]:
         
         output = result.stdout or result.stderr
         if not output:
-            return []
-        
-        # Parse output to find drivers
-        in_drivers_section = False
-        for line in output.splitlines():
-            line = line.strip()
-            if 'Audio drivers' in line:
-                in_drivers_section = True
-                continue
-            
-            if in_drivers_section:
-                if not line or line.startswith('-'):
-                    continue
-                if ':' in line:
-                    driver = line.split(':')[0].strip()
-                    if driver:
-                        drivers.append(driver)
-                else:
-                    # End of drivers section
-                    in_drivers_section = False
+            return ()
         
-        return drivers
+        # Parse the drivers listed after the "Audio drivers" header
+        idx = output.find('Audio drivers')
+        block = output[idx:] if idx >= 0 else output
+        drivers = [name for name in _DRIVER_RE.findall(block) if name != 'Name']
+        
+        return tuple(dict.fromkeys(drivers))
     except:
-        return []
+        return ()
+
+def _reset_caches() -> None:
+    """
+    Clear the memoized FluidSynth lookups (e.g. after installing FluidSynth
+    or changing PATH during the process lifetime).
+    """
+    global _FLUIDSYNTH_PATH
+    _FLUIDSYNTH_PATH = None
+    find_fluidsynth_executable.cache_clear()
+    detect_audio_driver.cache_clear()
+    _query_audio_drivers.cache_clear()
 
 def run_fluidsynth(sf2_path: str, midi_file: str, output_wav: Optional[str] = None, audio_driver: Optional[str] = None) -> bool:
     """
@@ -385,33 +967,28 @@ def run_fluidsynth(sf2_path: str, midi_file: str, output_wav: Optional[str] = No
     Returns:
         True if successful, False otherwise
     """
-    from sound_test import test_soundfont
+    # Imported here so that CLI paths that never play or render (--check,
+    # --drivers) don't pay for loading sound_test
+    from sound_test import play_wav_simple, play_wav_buffer
     
+    # The helpers render in-process with pyfluidsynth when it is available and
+    # only look up the executable for their subprocess fallback
     if output_wav:
         # Rendering mode
-        success, _ = test_soundfont(sf2_path, False, output_wav)
-        return success
+        return render_midi_to_wav(sf2_path, midi_file, output_wav, gain=0.7)
     else:
-        # Playback mode - tente gerar um WAV temporário e reproduzi-lo
-        temp_dir = tempfile.mkdtemp()
-        wav_path = os.path.join(temp_dir, "fluidsynth_temp.wav")
+        # Playback mode - renderizar direto para a memória e reproduzir o buffer
+        wav_data = _render_to_buffer(sf2_path, midi_file)
+        if wav_data:
+            return play_wav_buffer(wav_data, debug=False)
         
-        try:
-            success, wav_file = test_soundfont(sf2_path, False, wav_path)
-            
-            if success and wav_file:
-                from sound_test import play_wav
-                return play_wav_simple(wav_file, debug=False)
+        # Se não for possível, gerar um WAV temporário e reproduzi-lo
+        with tempfile.TemporaryDirectory(prefix='fluidsynth_') as temp_dir:
+            wav_path = os.path.join(temp_dir, "fluidsynth_temp.wav")
+            if render_midi_to_wav(sf2_path, midi_file, wav_path, gain=0.7):
+                return play_wav_simple(wav_path, debug=False)
             
             return False
-        
-        finally:
-            # Limpar arquivos temporários
-            try:
-                if os.path.exists(temp_dir):
-                    shutil.rmtree(temp_dir)
-            except:
-                pass
 
 def install_instructions() -> str:
     """
@@ -420,7 +997,7 @@ def install_instructions() -> str:
     Returns:
         Installation instructions string
     """
-    system = platform.system().lower()
+    system = _SYSTEM
     
     if system == 'linux':
         return """
@@ -470,12 +1047,15 @@ if __name__ == "__main__":
     parser.add_argument("--drivers", action="store_true", help="List available audio drivers")
     parser.add_argument("--play", nargs=2, metavar=("SOUNDFONT", "MIDI"), help="Play MIDI file with soundfont")
     parser.add_argument("--render", nargs=3, metavar=("SOUNDFONT", "MIDI", "WAV"), help="Render MIDI file to WAV")
+    parser.add_argument("--render-batch", nargs=3, metavar=("SOUNDFONT", "MIDI_DIR", "OUT_DIR"), help="Render every MIDI file in a directory to WAV in parallel")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes for --render-batch")
+    parser.add_argument("--cores", type=int, default=None, help="FluidSynth rendering threads per render (synth.cpu-cores; FluidSynth executable only)")
     parser.add_argument("--verbose", "-v", action="store_true", help="Show verbose output")
     
     args = parser.parse_args()
     
     if args.check:
-        fluidsynth_path = find_fluidsynth_executable()
+        fluidsynth_path = _get_fs_path()
         if fluidsynth_path:
             success, version = check_fluidsynth_version(fluidsynth_path)
             if success:
@@ -507,11 +1087,32 @@ if __name__ == "__main__":
     elif args.render:
         soundfont_path, midi_file, wav_file = args.render
         print(f"Rendering {midi_file} with {soundfont_path} to {wav_file}...")
-        success = render_midi_to_wav(soundfont_path, midi_file, wav_file, verbose=args.verbose)
+        success = render_midi_to_wav(soundfont_path, midi_file, wav_file, verbose=args.verbose, cpu_cores=args.cores)
         if success:
             print(f"Successfully rendered to {wav_file}")
         else:
             print("Failed to render. Check if FluidSynth is installed correctly.")
     
+    elif args.render_batch:
+        soundfont_path, midi_dir, out_dir = args.render_batch
+        os.makedirs(out_dir, exist_ok=True)
+        jobs = [
+            (soundfont_path, os.path.join(midi_dir, name), os.path.join(out_dir, os.path.splitext(name)[0] + '.wav'))
+            for name in sorted(os.listdir(midi_dir))
+            if name.lower().endswith(('.mid', '.midi'))
+        ]
+        if not jobs:
+            print(f"No MIDI files found in {midi_dir}")
+        else:
+            print(f"Rendering {len(jobs)} MIDI files with {soundfont_path}...")
+            failed = 0
+            for (_, midi_file, wav_file), success in render_midi_to_wav_batch(jobs, max_workers=args.workers, cpu_cores=args.cores or 1):
+                if success:
+                    print(f"  Rendered {wav_file}")
+                else:
+                    failed += 1
+                    print(f"  Failed to render {midi_file}")
+            print(f"Done: {len(jobs) - failed} rendered, {failed} failed")
+    
     else:
         parser.print_help()
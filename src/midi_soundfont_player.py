@@ -1,11 +1,15 @@
 #!/usr/bin/env python3
 import os
+import io
 import sys
 import argparse
-import pretty_midi
+import hashlib
+import itertools
+import shutil
+import subprocess
 import time
-import random
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional, Union, Tuple
 from colorama import Fore, Style, init
 import numpy as np
@@ -18,6 +22,48 @@ from soundfont_utils import SoundfontMetadata
 # Initialize Colorama
 init(autoreset=True)
 
+# Parsed note names ("C4" -> 60), shared by every generator instance
+_NAME_MIDI_CACHE: Dict[str, int] = {}
+
+# Pitch class of each natural note letter, indexed by ord(letter);
+# 0xFF marks characters that are not note letters
+_PITCH_CLASS_LUT = bytes(
+    dict(zip(b"CDEFGAB", (0, 2, 4, 5, 7, 9, 11))).get(code, 0xFF) for code in range(128)
+)
+
+# Seeded compositions are cached per user (mode 0700), keyed by their
+# arguments and this version; bump it whenever generation changes
+COMPOSITION_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "midi_soundfont_player")
+COMPOSITION_CACHE_VERSION = 1
+
+# Layout of single-note parts (melody, bass, drums): one contiguous record per note
+NOTE_DTYPE = np.dtype([
+    ("pitch", np.int16),
+    ("start", np.float64),
+    ("end", np.float64),
+    ("velocity", np.uint8)
+])
+
+def _note_array(pitches, starts, ends, velocities) -> np.ndarray:
+    """
+    Packs note columns into a NOTE_DTYPE structured array.
+    
+    Args:
+        pitches: MIDI numbers of the notes
+        starts: Start times in seconds
+        ends: End times in seconds
+        velocities: Note velocities
+        
+    Returns:
+        Structured array with one record per note
+    """
+    notes = np.empty(len(starts), dtype=NOTE_DTYPE)
+    notes["pitch"] = pitches
+    notes["start"] = starts
+    notes["end"] = ends
+    notes["velocity"] = velocities
+    return notes
+
 class ScaleType(Enum):
     """Types of musical scales."""
     MAJOR = "major"
@@ -91,6 +137,14 @@ class MusicGenerator:
         Chord.POWER: [0, 7]
     }
     
+    # Same intervals as NumPy arrays, so a scale/chord is one vectorized add
+    # (int16 leaves headroom above MIDI 127 for high octaves)
+    SCALES_ARR = {k: np.asarray(v, dtype=np.int16) for k, v in SCALES.items()}
+    CHORDS_ARR = {k: np.asarray(v, dtype=np.int16) for k, v in CHORDS.items()}
+    
+    # Semitone offset of each degree of the major scale, indexed by degree (I = 1)
+    SCALE_DEGREES_ARR = np.array([0, 0, 2, 4, 5, 7, 9, 11], dtype=np.int16)
+    
     # Mapping of note names to MIDI numbers (C4 = 60)
     NOTE_NAME_TO_MIDI = {
         "C": 0, "C#": 1, "Db": 1, "D": 2, "D#": 3, "Eb": 3,
@@ -98,6 +152,58 @@ class MusicGenerator:
         "Ab": 8, "A": 9, "A#": 10, "Bb": 10, "B": 11
     }
     
+    # Chord progressions by style (degree, chord type)
+    STYLE_PROGRESSIONS = {
+        "pop": [
+            [(1, Chord.MAJOR), (4, Chord.MAJOR), (5, Chord.MAJOR), (5, Chord.MAJOR)],
+            [(1, Chord.MAJOR), (5, Chord.MAJOR), (6, Chord.MINOR), (4, Chord.MAJOR)],
+            [(1, Chord.MAJOR), (4, Chord.MAJOR), (5, Chord.MAJOR), (1, Chord.MAJOR)]
+        ],
+        "rock": [
+            [(1, Chord.MAJOR), (5, Chord.MAJOR), (6, Chord.MINOR), (4, Chord.MAJOR)],
+            [(1, Chord.MAJOR), (4, Chord.MAJOR), (1, Chord.MAJOR), (5, Chord.MAJOR)],
+            [(1, Chord.POWER), (5, Chord.POWER), (6, Chord.POWER), (4, Chord.POWER)]
+        ],
+        "jazz": [
+            [(2, Chord.MINOR_7TH), (5, Chord.DOMINANT_7TH), (1, Chord.MAJOR_7TH), (1, Chord.MAJOR_7TH)],
+            [(1, Chord.MAJOR_7TH), (4, Chord.DOMINANT_7TH), (3, Chord.MINOR_7TH), (6, Chord.MINOR_7TH)],
+            [(2, Chord.MINOR_7TH), (5, Chord.DOMINANT_7TH), (1, Chord.MAJOR_7TH), (6, Chord.MINOR_7TH)]
+        ],
+        "classical": [
+            [(1, Chord.MAJOR), (4, Chord.MAJOR), (5, Chord.MAJOR), (1, Chord.MAJOR)],
+            [(1, Chord.MAJOR), (5, Chord.MAJOR), (6, Chord.MINOR), (3, Chord.MINOR)],
+            [(1, Chord.MAJOR), (4, Chord.MAJOR), (5, Chord.DOMINANT_7TH), (1, Chord.MAJOR)]
+        ]
+    }
+    
+    # MIDI programs for each part, by style
+    STYLE_INSTRUMENTS = {
+        "pop": {
+            "melody": 0,  # Piano
+            "chord": 0,   # Piano
+            "bass": 33,   # Fingered electric bass
+            "drum": 0     # Drum kit (GM)
+        },
+        "rock": {
+            "melody": 29,  # Distorted guitar
+            "chord": 29,   # Distorted guitar
+            "bass": 33,    # Fingered electric bass
+            "drum": 0      # Drum kit (GM)
+        },
+        "jazz": {
+            "melody": 66,  # Tenor saxophone
+            "chord": 0,    # Piano
+            "bass": 32,    # Acoustic bass
+            "drum": 0      # Drum kit (GM)
+        },
+        "classical": {
+            "melody": 73,  # Flute
+            "chord": 48,   # Strings
+            "bass": 43,    # Contrabass
+            "drum": 0      # (No drums for classical)
+        }
+    }
+    
     def __init__(self, soundfont_manager: SoundfontManager):
         """
         Initializes the music generator.
@@ -106,6 +212,16 @@ class MusicGenerator:
             soundfont_manager: Instance of SoundfontManager
         """
         self.manager = soundfont_manager
+        
+        # NumPy generator for drawing notes, velocities and durations in bulk
+        self._rng = np.random.default_rng()
+        
+        # Separate generator for choosing the soundfont, so the choice doesn't
+        # depend on how many draws the composition took (or on a cache hit)
+        self._choice_rng = np.random.default_rng()
+        
+        # Notes of the last scale from get_scale_notes, sorted for closest_in_scale
+        self._sorted_scale = np.empty(0, dtype=np.int16)
     
     def note_name_to_midi_number(self, note_name: str) -> int:
         """
@@ -117,20 +233,32 @@ class MusicGenerator:
         Returns:
             MIDI number of the note
         """
-        # Extract the note name and octave
-        if len(note_name) >= 2:
-            if note_name[1] in ['#', 'b']:
-                pitch_class = note_name[:2]
-                octave = int(note_name[2:]) if len(note_name) > 2 else 4
-            else:
-                pitch_class = note_name[0]
-                octave = int(note_name[1:]) if len(note_name) > 1 else 4
-        else:
-            pitch_class = note_name
-            octave = 4
+        midi_num = _NAME_MIDI_CACHE.get(note_name)
+        if midi_num is not None:
+            return midi_num
+        
+        # Extract the note letter (table lookup) and the optional accidental
+        code = ord(note_name[0]) if note_name else 0xFF
+        pitch_class = _PITCH_CLASS_LUT[code] if code < 128 else 0xFF
+        if pitch_class == 0xFF:
+            raise KeyError(note_name)
+        
+        octave_start = 1
+        accidental = note_name[1:2]
+        if accidental == '#':
+            pitch_class += 1
+            octave_start = 2
+        elif accidental == 'b':
+            pitch_class -= 1
+            octave_start = 2
+        
+        # Extract the octave
+        octave_str = note_name[octave_start:]
+        octave = int(octave_str) if octave_str else 4
         
         # Calculate the MIDI number
-        midi_num = 12 * (octave + 1) + self.NOTE_NAME_TO_MIDI[pitch_class]
+        midi_num = 12 * (octave + 1) + pitch_class
+        _NAME_MIDI_CACHE[note_name] = midi_num
         return midi_num
     
     def get_scale_notes(self, root_note: str, scale_type: ScaleType) -> List[int]:
@@ -147,11 +275,36 @@ class MusicGenerator:
         # Convert the root note to a MIDI number
         root_midi = self.note_name_to_midi_number(root_note)
         
-        # Get the intervals of the scale
-        intervals = self.SCALES[scale_type]
-        
         # Generate the scale notes
-        return [root_midi + interval for interval in intervals]
+        scale_notes = root_midi + self.SCALES_ARR[scale_type]
+        self._sorted_scale = np.sort(scale_notes)
+        return scale_notes.tolist()
+    
+    def closest_in_scale(self, midi_note: int) -> int:
+        """
+        Returns the note of the current scale closest to a MIDI number.
+        
+        Uses a binary search over the notes of the last scale built by
+        get_scale_notes; ties resolve to the lower note.
+        
+        Args:
+            midi_note: MIDI number to match
+            
+        Returns:
+            MIDI number of the closest scale note
+        """
+        scale = self._sorted_scale
+        if not len(scale):
+            raise ValueError("No scale selected; call get_scale_notes first")
+        
+        i = int(np.searchsorted(scale, midi_note))
+        if i == 0:
+            return int(scale[0])
+        if i == len(scale):
+            return int(scale[-1])
+        
+        below, above = int(scale[i - 1]), int(scale[i])
+        return below if midi_note - below <= above - midi_note else above
     
     def get_chord_notes(self, root_note: str, chord_type: Chord) -> List[int]:
         """
@@ -167,11 +320,8 @@ class MusicGenerator:
         # Convert the root note to a MIDI number
         root_midi = self.note_name_to_midi_number(root_note)
         
-        # Get the intervals of the chord
-        intervals = self.CHORDS[chord_type]
-        
         # Generate the chord notes
-        return [root_midi + interval for interval in intervals]
+        return (root_midi + self.CHORDS_ARR[chord_type]).tolist()
     
     def create_chord_progression(self, 
                                 key: str, 
@@ -193,37 +343,31 @@ class MusicGenerator:
         # Convert to MIDI
         key_midi = self.NOTE_NAME_TO_MIDI[key] + 12 * (octave + 1)
         
-        # Dictionary of degrees in the major scale
-        scale_degrees = {
-            1: 0,   # I
-            2: 2,   # II
-            3: 4,   # III
-            4: 5,   # IV
-            5: 7,   # V
-            6: 9,   # VI
-            7: 11   # VII
-        }
+        # Root note of every chord at once (unknown degrees fall back to the tonic)
+        degrees = np.fromiter((degree for degree, _ in progression), dtype=np.int64, count=len(progression))
+        valid = (degrees >= 1) & (degrees <= 7)
+        roots = key_midi + np.where(valid, self.SCALE_DEGREES_ARR[degrees % 8], 0)
+        
+        # Chord timing
+        starts = np.arange(len(progression)) * duration
+        ends = starts + duration
         
         chords = []
-        current_time = 0.0
         
-        for degree, chord_type in progression:
-            # Calculate the root note of the chord
-            root_offset = scale_degrees.get(degree, 0)
-            root_midi = key_midi + root_offset
-            
-            # Get the chord notes
-            chord_notes = [root_midi + interval for interval in self.CHORDS[chord_type]]
+        for root, (_, chord_type), start, end in zip(roots.tolist(), progression,
+                                                     starts.tolist(), ends.tolist()):
+            # One broadcast add per chord gives all of its notes
+            chord_notes = root + self.CHORDS_ARR[chord_type]
             
-            # Add the chord to the list
             chords.append({
-                "notes": chord_notes,
-                "start": current_time,
-                "end": current_time + duration,
-                "velocity": 80
+                "notes": chord_notes.tolist(),
+                "start": start,
+                "end": end,
+                "velocity": 80,
+                # Bass data for create_bass_line, one octave below
+                "bass_root": int(chord_notes.min()) - 12,
+                "bass_notes": (chord_notes - 12).tolist()
             })
-            
-            current_time += duration
         
         return chords
     
@@ -231,7 +375,7 @@ class MusicGenerator:
                      scale_notes: List[int], 
                      num_notes: int = 8, 
                      rhythm: Optional[List[float]] = None,
-                     velocity_range: Tuple[int, int] = (60, 100)) -> List[Dict]:
+                     velocity_range: Tuple[int, int] = (60, 100)) -> np.ndarray:
         """
         Creates a melody using notes from a scale.
         
@@ -242,47 +386,32 @@ class MusicGenerator:
             velocity_range: Velocity (volume) range of the notes
             
         Returns:
-            List of dictionaries with melody note information
+            Structured array (NOTE_DTYPE) with melody note information
         """
-        melody = []
-        current_time = 0.0
-        
-        # Use provided rhythm or generate a random one
-        if rhythm is None:
+        # Use provided rhythm or generate a random one (an empty rhythm
+        # cannot be repeated, so it is treated as missing)
+        if not rhythm:
             # Generate random durations (between 0.1 and 0.5 seconds)
-            rhythm = [round(random.uniform(0.1, 0.5), 2) for _ in range(num_notes)]
+            rhythm_arr = self._rng.uniform(0.1, 0.5, num_notes).round(2)
+        else:
+            # Repeat or truncate the rhythm to exactly num_notes durations
+            rhythm_arr = np.resize(np.asarray(rhythm, dtype=np.float64), num_notes)
         
-        # Ensure we have enough durations
-        if len(rhythm) < num_notes:
-            rhythm = rhythm * (num_notes // len(rhythm) + 1)
-            rhythm = rhythm[:num_notes]
+        # Time axis: each note starts where the previous one ends
+        starts = np.zeros_like(rhythm_arr)
+        starts[1:] = np.cumsum(rhythm_arr)[:-1]
+        ends = starts + rhythm_arr
         
-        # Generate the melody
-        for i in range(num_notes):
-            # Select a random note from the scale
-            note = random.choice(scale_notes)
-            
-            # Select a random velocity
-            velocity = random.randint(velocity_range[0], velocity_range[1])
-            
-            # Note duration
-            duration = rhythm[i]
-            
-            # Add the note to the melody
-            melody.append({
-                "note": note,
-                "start": current_time,
-                "end": current_time + duration,
-                "velocity": velocity
-            })
-            
-            current_time += duration
+        # Draw all notes and velocities at once
+        notes = self._rng.choice(scale_notes, size=num_notes)
+        velocities = self._rng.integers(velocity_range[0], velocity_range[1] + 1, size=num_notes)
         
-        return melody
+        # Generate the melody
+        return _note_array(notes, starts, ends, velocities)
     
     def create_bass_line(self, 
                         chord_progression: List[Dict], 
-                        pattern: str = "simple") -> List[Dict]:
+                        pattern: str = "simple") -> np.ndarray:
         """
         Creates a bass line based on a chord progression.
         
@@ -291,75 +420,66 @@ class MusicGenerator:
             pattern: Rhythmic pattern for the bass
             
         Returns:
-            List of dictionaries with bass note information
+            Structured array (NOTE_DTYPE) with bass note information
         """
-        bass_line = []
+        num_chords = len(chord_progression)
+        chord_starts = np.fromiter((chord["start"] for chord in chord_progression),
+                                   dtype=np.float64, count=num_chords)
+        chord_ends = np.fromiter((chord["end"] for chord in chord_progression),
+                                 dtype=np.float64, count=num_chords)
         
-        for chord in chord_progression:
-            chord_start = chord["start"]
-            chord_end = chord["end"]
-            chord_duration = chord_end - chord_start
-            
-            # Use the lowest note of the chord as the bass note
-            bass_note = min(chord["notes"]) - 12  # One octave below
-            
-            if pattern == "simple":
-                # Simple pattern: one long note per chord
-                bass_line.append({
-                    "note": bass_note,
-                    "start": chord_start,
-                    "end": chord_end,
-                    "velocity": 100
-                })
-            
-            elif pattern == "walking":
-                # Walking bass pattern: four notes per chord
-                step_duration = chord_duration / 4
-                
-                # Chord notes, one octave below
-                chord_notes = [note - 12 for note in chord["notes"]]
-                
-                for i in range(4):
-                    if i == 0:
-                        # First note is the root
-                        note = chord_notes[0]
-                    else:
-                        # Other notes are chosen randomly
-                        note = random.choice(chord_notes)
-                    
-                    bass_line.append({
-                        "note": note,
-                        "start": chord_start + i * step_duration,
-                        "end": chord_start + (i + 1) * step_duration,
-                        "velocity": 90 if i == 0 else 80
-                    })
-            
-            elif pattern == "arpeggiated":
-                # Arpeggiated pattern: arpeggio of the chord notes
-                step_duration = chord_duration / 4
-                
-                # Chord notes, one octave below
-                chord_notes = [note - 12 for note in chord["notes"]]
-                
-                # If the chord has less than 4 notes, repeat some
-                if len(chord_notes) < 4:
-                    chord_notes = chord_notes + chord_notes[:4-len(chord_notes)]
-                
-                for i in range(4):
-                    bass_line.append({
-                        "note": chord_notes[i],
-                        "start": chord_start + i * step_duration,
-                        "end": chord_start + (i + 1) * step_duration,
-                        "velocity": 85
-                    })
-        
-        return bass_line
+        # Chords not made by create_chord_progression may lack the precomputed
+        # bass data; derive it from the chord notes, one octave below
+        bass_notes = [chord.get("bass_notes") or [note - 12 for note in chord["notes"]]
+                      for chord in chord_progression]
+        
+        if pattern == "simple":
+            # Simple pattern: one long note per chord, on the lowest chord
+            # note one octave below
+            pitches = [chord.get("bass_root", min(chord["notes"]) - 12)
+                       for chord in chord_progression]
+            return _note_array(pitches, chord_starts, chord_ends, np.full(num_chords, 100))
+        
+        # The other patterns play four notes per chord (chord notes one octave below)
+        if pattern == "walking":
+            # Walking bass pattern: first note is the root, the other three are
+            # random chord notes (uniform [0, 1) draws scaled to each chord's size)
+            walk_draws = self._rng.random((num_chords, 3))
+            pitches = [
+                [notes[0], *(notes[j] for j in (draws * len(notes)).astype(np.intp).tolist())]
+                for notes, draws in zip(bass_notes, walk_draws)
+            ]
+            velocities = np.array([90, 80, 80, 80])
+        
+        elif pattern == "arpeggiated":
+            # Arpeggiated pattern: arpeggio of the chord notes, repeating some
+            # if the chord has less than 4 notes
+            pitches = [(notes * 4)[:4] for notes in bass_notes]
+            velocities = np.full(4, 85)
+        
+        else:
+            return np.empty(0, dtype=NOTE_DTYPE)
+        
+        # Step timing for every chord at once: shape (chords, 4)
+        step_durations = ((chord_ends - chord_starts) / 4)[:, None]
+        steps = np.arange(4)
+        starts = chord_starts[:, None] + steps * step_durations
+        ends = chord_starts[:, None] + (steps + 1) * step_durations
+        
+        return _note_array(
+            np.asarray(pitches, dtype=np.int16).ravel(),
+            starts.ravel(),
+            ends.ravel(),
+            np.broadcast_to(velocities, (num_chords, 4)).ravel()
+        )
     
     def create_drum_pattern(self, 
                           total_duration: float, 
                           pattern: str = "basic", 
                           beats_per_measure: int = 4,
-                          tempo: float = 120.0) -> List[Dict]:
+                          tempo: float = 120.0,
+                          measure_duration: Optional[float] = None,
+                          step_duration: Optional[float] = None) -> np.ndarray:
         """
         Creates a drum pattern.
         
@@ -368,17 +488,22 @@ class MusicGenerator:
             pattern: Type of drum pattern
             beats_per_measure: Number of beats per measure
             tempo: Tempo in BPM
+            measure_duration: Precomputed duration of one measure in seconds (optional)
+            step_duration: Precomputed duration of one pattern step in seconds (optional)
             
         Returns:
-            List of dictionaries with drum note information
+            Structured array (NOTE_DTYPE) with drum note information
         """
-        drum_notes = []
+        # Duration of one beat
+        beat_duration = 60.0 / tempo
         
         # Duration of one measure in seconds
-        measure_duration = (60.0 / tempo) * beats_per_measure
+        if measure_duration is None:
+            measure_duration = beat_duration * beats_per_measure
         
-        # Duration of one beat
-        beat_duration = measure_duration / beats_per_measure
+        # Duration of one pattern step (8 steps in 4 beats)
+        if step_duration is None:
+            step_duration = beat_duration / 2
         
         # Number of measures
         num_measures = max(1, int(total_duration / measure_duration))
@@ -414,41 +539,39 @@ class MusicGenerator:
         
         # Number of steps in the pattern
         pattern_steps = 8
-        step_duration = beat_duration / 2  # 8 steps in 4 beats
         
-        # Generate drum notes for each measure
-        for measure in range(num_measures):
-            measure_start = measure * measure_duration
-            
-            for step in range(pattern_steps):
-                step_start = measure_start + step * step_duration
-                step_end = step_start + step_duration
-                
-                for drum, hits in drum_pattern.items():
-                    if step < len(hits) and hits[step]:
-                        velocity = 100 if drum in [KICK, SNARE] else 80
-                        
-                        drum_notes.append({
-                            "note": drum,
-                            "start": step_start,
-                            "end": step_end,
-                            "velocity": velocity
-                        })
-        
-        return drum_notes
+        # Hit mask of shape (steps of all measures, drums); transposed so that
+        # nonzero() yields hits ordered by time, then drum
+        drums = np.fromiter(drum_pattern.keys(), dtype=np.int16, count=len(drum_pattern))
+        hits = np.array([h[:pattern_steps] for h in drum_pattern.values()], dtype=np.int8)
+        mask = np.tile(hits, (1, num_measures)).T
+        step_idx, drum_idx = np.nonzero(mask)
+        
+        # Generate drum notes for every hit at once
+        measure_idx, step_in_measure = np.divmod(step_idx, pattern_steps)
+        starts = measure_idx * measure_duration + step_in_measure * step_duration
+        ends = starts + step_duration
+        pitches = drums[drum_idx]
+        velocities = np.where(np.isin(pitches, (KICK, SNARE)), 100, 80)
+        
+        return _note_array(pitches, starts, ends, velocities)
     
     def create_midi(self, 
                    instruments: Dict[str, int], 
-                   parts: Dict[str, List[Dict]], 
+                   parts: Dict[str, Union[np.ndarray, List[Dict]]], 
                    output_file: str) -> None:
         """
         Creates a MIDI file with multiple parts.
         
         Args:
             instruments: Dictionary with part name and MIDI program
-            parts: Dictionary with part name and list of notes
+            parts: Dictionary with part name and its notes (NOTE_DTYPE array,
+                   or list of chord dictionaries)
             output_file: Path to the output MIDI file
         """
+        # Deferred: pretty_midi is slow to import and only needed to write MIDI
+        import pretty_midi
+        
         # Create a PrettyMIDI object
         midi = pretty_midi.PrettyMIDI()
         
@@ -460,33 +583,62 @@ class MusicGenerator:
             # Create an instrument
             instrument = pretty_midi.Instrument(program=program)
             
+            part = parts[part_name]
+            
+            if isinstance(part, np.ndarray):
+                # Single-note parts: convert each column to Python values in one go
+                events = zip(part["pitch"].tolist(), part["start"].tolist(),
+                             part["end"].tolist(), part["velocity"].tolist())
+            else:
+                # Chords (multiple notes) or single-note dictionaries
+                events = itertools.chain.from_iterable(
+                    ((note, note_info["start"], note_info["end"], note_info["velocity"])
+                     for note in note_info["notes"])
+                    if "notes" in note_info else
+                    ((note_info["note"], note_info["start"], note_info["end"], note_info["velocity"]),)
+                    for note_info in part
+                )
+            
             # Add the notes
-            for note_info in parts[part_name]:
-                if "notes" in note_info:
-                    # Chord (multiple notes)
-                    for note in note_info["notes"]:
-                        midi_note = pretty_midi.Note(
-                            velocity=note_info["velocity"],
-                            pitch=note,
-                            start=note_info["start"],
-                            end=note_info["end"]
-                        )
-                        instrument.notes.append(midi_note)
-                else:
-                    # Single note
-                    midi_note = pretty_midi.Note(
-                        velocity=note_info["velocity"],
-                        pitch=note_info["note"],
-                        start=note_info["start"],
-                        end=note_info["end"]
-                    )
-                    instrument.notes.append(midi_note)
+            instrument.notes.extend(
+                pretty_midi.Note(velocity=velocity, pitch=pitch, start=start, end=end)
+                for pitch, start, end, velocity in events
+            )
             
             # Add the instrument to the MIDI
             midi.instruments.append(instrument)
         
-        # Save the MIDI file
-        midi.write(output_file)
+        # Serialize in memory (mido emits many small writes), then save the
+        # MIDI file in one write
+        buffer = io.BytesIO()
+        midi.write(buffer)
+        with open(output_file, "wb") as f:
+            f.write(buffer.getvalue())
+    
+    def create_midi_bulk(self, 
+                        jobs: List[Tuple[Dict[str, int], Dict[str, Union[np.ndarray, List[Dict]]], str]],
+                        max_workers: int = 4) -> List[str]:
+        """
+        Creates several MIDI files, overlapping their file writes in a thread pool.
+        
+        Args:
+            jobs: List of tuples (instruments, parts, output_file), as taken by create_midi
+            max_workers: Maximum number of writer threads
+            
+        Returns:
+            Paths to the created MIDI files, in job order
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self.create_midi, instruments, parts, output_file)
+                for instruments, parts, output_file in jobs
+            ]
+            
+            # Propagate the first error, if any
+            for future in futures:
+                future.result()
+        
+        return [output_file for _, _, output_file in jobs]
     
     def generate_composition(self, 
                            key: str = "C", 
@@ -494,7 +646,8 @@ class MusicGenerator:
                            tempo: float = 120.0,
                            num_measures: int = 4,
                            style: str = "pop",
-                           output_file: str = "composition.mid") -> str:
+                           output_file: str = "composition.mid",
+                           seed: Optional[int] = None) -> str:
         """
         Generates a complete musical composition.
         
@@ -505,42 +658,39 @@ class MusicGenerator:
             num_measures: Number of measures
             style: Musical style
             output_file: Path to the output MIDI file
+            seed: Random seed (optional); seeded compositions are cached and reused
             
         Returns:
             Path to the generated MIDI file
         """
-        # Duration of one measure in seconds
-        measure_duration = (60.0 / tempo) * 4  # Assuming 4/4
+        # A seeded composition is fully determined by its arguments, so a
+        # previous render with the same inputs can be copied instead
+        cache_file = None
+        if seed is not None:
+            self._rng = np.random.default_rng(seed)
+            self._choice_rng = np.random.default_rng([seed, 1])
+            
+            cache_key = hashlib.blake2s(
+                repr((COMPOSITION_CACHE_VERSION, key, scale_type.value, tempo, num_measures,
+                      style, seed)).encode()
+            ).hexdigest()[:16]
+            cache_file = os.path.join(COMPOSITION_CACHE_DIR, f"composition_{cache_key}.mid")
+            
+            if os.path.isfile(cache_file):
+                shutil.copyfile(cache_file, output_file)
+                return output_file
+        
+        # Durations in seconds, computed once from the tempo
+        beat_duration = 60.0 / tempo
+        measure_duration = beat_duration * 4  # Assuming 4/4
+        step_duration = beat_duration / 2     # Drum pattern steps (eighth notes)
         
         # Total duration of the composition
         total_duration = measure_duration * num_measures
         
-        # Chord progressions by style
-        style_progressions = {
-            "pop": [
-                [(1, Chord.MAJOR), (4, Chord.MAJOR), (5, Chord.MAJOR), (5, Chord.MAJOR)],
-                [(1, Chord.MAJOR), (5, Chord.MAJOR), (6, Chord.MINOR), (4, Chord.MAJOR)],
-                [(1, Chord.MAJOR), (4, Chord.MAJOR), (5, Chord.MAJOR), (1, Chord.MAJOR)]
-            ],
-            "rock": [
-                [(1, Chord.MAJOR), (5, Chord.MAJOR), (6, Chord.MINOR), (4, Chord.MAJOR)],
-                [(1, Chord.MAJOR), (4, Chord.MAJOR), (1, Chord.MAJOR), (5, Chord.MAJOR)],
-                [(1, Chord.POWER), (5, Chord.POWER), (6, Chord.POWER), (4, Chord.POWER)]
-            ],
-            "jazz": [
-                [(2, Chord.MINOR_7TH), (5, Chord.DOMINANT_7TH), (1, Chord.MAJOR_7TH), (1, Chord.MAJOR_7TH)],
-                [(1, Chord.MAJOR_7TH), (4, Chord.DOMINANT_7TH), (3, Chord.MINOR_7TH), (6, Chord.MINOR_7TH)],
-                [(2, Chord.MINOR_7TH), (5, Chord.DOMINANT_7TH), (1, Chord.MAJOR_7TH), (6, Chord.MINOR_7TH)]
-            ],
-            "classical": [
-                [(1, Chord.MAJOR), (4, Chord.MAJOR), (5, Chord.MAJOR), (1, Chord.MAJOR)],
-                [(1, Chord.MAJOR), (5, Chord.MAJOR), (6, Chord.MINOR), (3, Chord.MINOR)],
-                [(1, Chord.MAJOR), (4, Chord.MAJOR), (5, Chord.DOMINANT_7TH), (1, Chord.MAJOR)]
-            ]
-        }
-        
         # Select a progression for the chosen style
-        progression = random.choice(style_progressions.get(style, style_progressions["pop"]))
+        progressions = self.STYLE_PROGRESSIONS.get(style, self.STYLE_PROGRESSIONS["pop"])
+        progression = progressions[self._rng.integers(len(progressions))]
         
         # Create the chord progression
         chord_progression = self.create_chord_progression(
@@ -586,38 +736,12 @@ class MusicGenerator:
         drum_part = self.create_drum_pattern(
             total_duration=total_duration,
             pattern=drum_pattern,
-            tempo=tempo
+            tempo=tempo,
+            measure_duration=measure_duration,
+            step_duration=step_duration
         )
         
-        # Define instruments by style
-        style_instruments = {
-            "pop": {
-                "melody": 0,  # Piano
-                "chord": 0,   # Piano
-                "bass": 33,   # Fingered electric bass
-                "drum": 0     # Drum kit (GM)
-            },
-            "rock": {
-                "melody": 29,  # Distorted guitar
-                "chord": 29,   # Distorted guitar
-                "bass": 33,    # Fingered electric bass
-                "drum": 0      # Drum kit (GM)
-            },
-            "jazz": {
-                "melody": 66,  # Tenor saxophone
-                "chord": 0,    # Piano
-                "bass": 32,    # Acoustic bass
-                "drum": 0      # Drum kit (GM)
-            },
-            "classical": {
-                "melody": 73,  # Flute
-                "chord": 48,   # Strings
-                "bass": 43,    # Contrabass
-                "drum": 0      # (No drums for classical)
-            }
-        }
-        
-        instruments = style_instruments.get(style, style_instruments["pop"])
+        instruments = self.STYLE_INSTRUMENTS.get(style, self.STYLE_INSTRUMENTS["pop"])
         
         # Parts of the composition
         parts = {
@@ -637,6 +761,24 @@ class MusicGenerator:
             output_file=output_file
         )
         
+        if cache_file:
+            tmp_path = None
+            try:
+                os.makedirs(COMPOSITION_CACHE_DIR, mode=0o700, exist_ok=True)
+                # Private, freshly created file renamed into place: never
+                # writes through an existing path
+                fd, tmp_path = tempfile.mkstemp(suffix=".mid", dir=COMPOSITION_CACHE_DIR)
+                with os.fdopen(fd, "wb") as dst, open(output_file, "rb") as src:
+                    shutil.copyfileobj(src, dst)
+                os.replace(tmp_path, cache_file)
+            except OSError:
+                # The cache is only an optimization
+                if tmp_path:
+                    try:
+                        os.unlink(tmp_path)
+                    except OSError:
+                        pass
+        
         return output_file
     
     def play_composition_with_soundfont(self, 
@@ -644,7 +786,8 @@ class MusicGenerator:
                                       soundfont_id: Optional[int] = None,
                                       instrument_type: Optional[str] = None,
                                       quality: Optional[str] = None,
-                                      tags: Optional[List[str]] = None) -> None:
+                                      tags: Optional[List[str]] = None,
+                                      quiet: bool = False) -> None:
         """
         Plays a MIDI composition using a soundfont.
         
@@ -654,6 +797,7 @@ class MusicGenerator:
             instrument_type: Instrument type for selection (optional)
             quality: Desired quality (optional)
             tags: Tags to filter soundfonts (optional)
+            quiet: If True, discard FluidSynth's console output
         """
         # Select a soundfont
         if soundfont_id is not None:
@@ -672,15 +816,16 @@ class MusicGenerator:
                 filtered = [sf for sf in filtered if sf.quality == quality]
             
             if tags:
-                tag_matches = self.manager.get_soundfonts_by_tags(tags)
-                filtered = [sf for sf in filtered if sf in tag_matches]
+                # Set of IDs: O(1) membership instead of scanning the match list
+                tag_ids = {sf.id for sf in self.manager.get_soundfonts_by_tags(tags)}
+                filtered = [sf for sf in filtered if sf.id in tag_ids]
             
             if not filtered:
                 print(Fore.RED + "No soundfont found with the specified criteria." + Style.RESET_ALL)
                 return
             
             # Select a random soundfont from the filtered ones
-            soundfont = random.choice(filtered)
+            soundfont = filtered[self._choice_rng.integers(len(filtered))]
         
         print(Fore.GREEN + f"\nPlaying composition with soundfont: {soundfont.name}" + Style.RESET_ALL)
         print(Fore.CYAN + f"Instrument type: {soundfont.instrument_type}" + Style.RESET_ALL)
@@ -690,8 +835,15 @@ class MusicGenerator:
         # Get the absolute path of the soundfont
         sf_path = self.manager.get_absolute_path(soundfont)
         
-        # Play the MIDI with FluidSynth
-        os.system(f"fluidsynth -a alsa -g 1.0 {sf_path} {midi_file}")
+        # Play the MIDI with FluidSynth (argument list: no intermediate shell,
+        # and paths with spaces are passed through intact)
+        output = subprocess.DEVNULL if quiet else None
+        subprocess.run(
+            ["fluidsynth", "-a", "alsa", "-g", "1.0", sf_path, midi_file],
+            stdout=output,
+            stderr=output,
+            check=False
+        )
 
 def setup_argparse() -> argparse.ArgumentParser:
     """
@@ -758,6 +910,12 @@ def setup_argparse() -> argparse.ArgumentParser:
         choices=["pop", "rock", "jazz", "classical"]
     )
     
+    parser.add_argument(
+        "--seed",
+        help="Random seed (repeated runs with the same seed reuse the cached MIDI)",
+        type=int
+    )
+    
     parser.add_argument(
         "--sf-id",
         help="Specific soundfont ID for playback",
@@ -786,6 +944,12 @@ def setup_argparse() -> argparse.ArgumentParser:
         action="store_true"
     )
     
+    parser.add_argument(
+        "--quiet",
+        help="Hide FluidSynth output during playback",
+        action="store_true"
+    )
+    
     parser.add_argument(
         "--list-soundfonts",
         help="List all available soundfonts",
@@ -807,15 +971,19 @@ def list_all_soundfonts(manager: SoundfontManager) -> None:
         print(Fore.RED + "No soundfonts found in the database." + Style.RESET_ALL)
         return
     
-    print(Fore.YELLOW + f"\n=== {len(soundfonts)} Available Soundfonts ===" + Style.RESET_ALL)
+    # Build the whole listing first and write it in one call
+    lines = [Fore.YELLOW + f"\n=== {len(soundfonts)} Available Soundfonts ===" + Style.RESET_ALL]
     
     for sf in soundfonts:
-        print(Fore.GREEN + f"\nID: {sf.id} - {sf.name}" + Style.RESET_ALL)
-        print(Fore.CYAN + f"  Type: {sf.instrument_type}" + Style.RESET_ALL)
-        print(Fore.CYAN + f"  Quality: {sf.quality}" + Style.RESET_ALL)
-        print(Fore.CYAN + f"  Tags: {', '.join(sf.tags)}" + Style.RESET_ALL)
-        print(Fore.CYAN + f"  Genres: {', '.join(sf.genre)}" + Style.RESET_ALL)
-        print(Fore.CYAN + f"  Size: {sf.size_mb:.2f} MB" + Style.RESET_ALL)
+        lines.append(Fore.GREEN + f"\nID: {sf.id} - {sf.name}" + Style.RESET_ALL)
+        lines.append(Fore.CYAN + f"  Type: {sf.instrument_type}" + Style.RESET_ALL)
+        lines.append(Fore.CYAN + f"  Quality: {sf.quality}" + Style.RESET_ALL)
+        lines.append(Fore.CYAN + f"  Tags: {', '.join(sf.tags)}" + Style.RESET_ALL)
+        lines.append(Fore.CYAN + f"  Genres: {', '.join(sf.genre)}" + Style.RESET_ALL)
+        lines.append(Fore.CYAN + f"  Size: {sf.size_mb:.2f} MB" + Style.RESET_ALL)
+    
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
 
 def main() -> None:
     """Main function of the program."""
@@ -847,7 +1015,8 @@ def main() -> None:
         tempo=args.tempo,
         num_measures=args.measures,
         style=args.style,
-        output_file=args.output
+        output_file=args.output,
+        seed=args.seed
     )
     
     print(Fore.GREEN + f"\nComposition generated successfully: {midi_file}" + Style.RESET_ALL)
@@ -865,7 +1034,8 @@ def main() -> None:
             soundfont_id=args.sf_id,
             instrument_type=args.instrument_type,
             quality=args.quality,
-            tags=tags
+            tags=tags,
+            quiet=args.quiet
         )
 
 if __name__ == "__main__":
@@ -1,108 +1,140 @@
 #!/usr/bin/env python3
 import os
+import atexit
+import hashlib
 import json
 import argparse
-import pretty_midi
 import logging
+import shutil
 import subprocess
 import tempfile
+import traceback
 import platform
+import importlib.util
+from functools import lru_cache
+from itertools import islice
 from colorama import Fore, Style, init
-from typing import List, Dict, Optional, Union, Any
+from typing import List, Dict, Optional, Tuple, Union, Any
 import sys
-import re
-from enum import Enum
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from enum import IntFlag
 
 # Configure logging to reduce sf2utils warnings
 logging.basicConfig(level=logging.ERROR)  # Only show errors, not warnings
 
-# Import system modules
+# Import system modules (analysis and playback helpers are imported
+# where they are used, so --help, --list and --scan start quickly)
 from soundfont_utils import (
     SoundfontMetadata,
-    MappedNotes,
+    SF2_SUFFIXES,
     extract_sf2_metadata,
-    analyze_timbre,
-    generate_tag_suggestions,
-    suggest_genres,
-    suggest_quality,
-    create_test_midi,
-    test_note_range
-)
-
-from fluidsynth_helper import (
-    run_fluidsynth,
-    detect_audio_driver
+    # Aliased: annotate_soundfont and friends take a test_note_range flag
+    test_note_range as _test_note_range
 )
 
 from soundfont_manager import SoundfontManager
 
-from sound_test import (
-    play_wav_simple,
-    create_single_note_midi,
-    is_silent_wav
+# Color codes used by the message helpers below (empty when colors are off)
+_GREEN, _RED, _CYAN, _YELLOW, _RESET = Fore.GREEN, Fore.RED, Fore.CYAN, Fore.YELLOW, Style.RESET_ALL
+
+def _disable_colors() -> None:
+    """Turn colored output off (redirected output and --quiet)."""
+    global _GREEN, _RED, _CYAN, _YELLOW, _RESET
+    _GREEN = _RED = _CYAN = _YELLOW = _RESET = ""
+
+# Initialize Colorama (only on a terminal; redirected output gets no color codes)
+if sys.stdout is not None and sys.stdout.isatty():
+    init(autoreset=True)
+else:
+    _disable_colors()
+
+def _g(msg: str) -> str:
+    """Green text."""
+    return f"{_GREEN}{msg}{_RESET}"
+
+def _r(msg: str) -> str:
+    """Red text."""
+    return f"{_RED}{msg}{_RESET}"
+
+def _c(msg: str) -> str:
+    """Cyan text."""
+    return f"{_CYAN}{msg}{_RESET}"
+
+def _y(msg: str) -> str:
+    """Yellow text."""
+    return f"{_YELLOW}{msg}{_RESET}"
+
+_COLOR_FUNCS = {"green": _g, "red": _r, "cyan": _c, "yellow": _y}
+
+# Set by --quiet: per-soundfont progress messages are not printed
+_QUIET = False
+
+def _info(msg: str, color: str = "green", flush: bool = False) -> None:
+    """
+    Print a progress message (nothing with --quiet).
+    
+    Args:
+        msg: Message to print
+        color: Color name (green, red, cyan or yellow)
+        flush: If True, flush stdout (for messages printed before a long wait)
+    """
+    if not _QUIET:
+        print(_COLOR_FUNCS[color](msg), flush=flush)
+
+# Audio playback libraries, as (name shown to the user, modules it needs)
+AUDIO_LIBRARIES = (
+    ("pygame", ("pygame",)),
+    ("playsound", ("playsound",)),
+    ("simpleaudio", ("simpleaudio",)),
+    ("sounddevice+soundfile", ("sounddevice", "soundfile")),
 )
 
-# Initialize Colorama
-init(autoreset=True)
+@lru_cache(maxsize=1)
+def _available_audio_libraries() -> tuple:
+    """
+    Find the installed audio playback libraries without importing them.
+    
+    Returns:
+        Tuple with the names of the available libraries
+    """
+    return tuple(
+        name for name, modules in AUDIO_LIBRARIES
+        if all(importlib.util.find_spec(module) is not None for module in modules)
+    )
 
-def check_audio_dependencies(debug=False):
+def check_audio_dependencies(debug=False, install=False):
     """
-    Check which audio playback modules are available and try to 
+    Check which audio playback modules are available and optionally 
     install one if necessary.
     
     Args:
         debug: If True, shows debug info
+        install: If True and no module is available, try to install pygame with pip
         
     Returns:
         True if at least one dependency is available
     """
-    available_packages = []
+    available_packages = _available_audio_libraries()
     
-    try:
-        import pygame
-        available_packages.append("pygame")
-    except ImportError:
-        if debug:
-            print("pygame not available")
-    
-    try:
-        import playsound
-        available_packages.append("playsound")
-    except ImportError:
-        if debug:
-            print("playsound not available")
-    
-    try:
-        import simpleaudio
-        available_packages.append("simpleaudio")
-    except ImportError:
-        if debug:
-            print("simpleaudio not available")
-    
-    try:
-        import sounddevice
-        import soundfile
-        available_packages.append("sounddevice+soundfile")
-    except ImportError:
-        if debug:
-            print("sounddevice and/or soundfile not available")
+    if debug:
+        for name, _ in AUDIO_LIBRARIES:
+            if name not in available_packages:
+                print(f"{name} not available")
     
-    # Se nenhum pacote estiver disponível, tente instalar um
-    if not available_packages:
+    # Se nenhum pacote estiver disponível, tente instalar um (apenas com --install-audio)
+    if not available_packages and install:
         try:
             print("No audio library found. Trying to install pygame...")
-            import subprocess
             subprocess.run([sys.executable, "-m", "pip", "install", "pygame"], 
-                          stdout=subprocess.PIPE,
-                          stderr=subprocess.PIPE)
+                          stdout=subprocess.DEVNULL,
+                          stderr=subprocess.DEVNULL)
             
             # Verificar se conseguimos instalar
-            try:
-                import pygame
-                available_packages.append("pygame")
+            importlib.invalidate_caches()
+            _available_audio_libraries.cache_clear()
+            available_packages = _available_audio_libraries()
+            if available_packages:
                 print("pygame installed!")
-            except ImportError:
-                pass
         except Exception as e:
             if debug:
                 print(f"pygame was not installed: {e}")
@@ -115,11 +147,24 @@ def check_audio_dependencies(debug=False):
     
     return len(available_packages) > 0
 
-class AnalysisMode(Enum):
-    """Available analysis modes."""
-    BASIC = "basic"       # Basic metadata extraction
-    FULL = "full"         # Full analysis (including timbre analysis)
-    INTERACTIVE = "interactive"  # Interactive mode (user questions)
+class AnalysisMode(IntFlag):
+    """Available analysis modes (bit flags, so mode checks are a single AND)."""
+    BASIC = 1        # Basic metadata extraction
+    FULL = 2         # Full analysis (including timbre analysis)
+    INTERACTIVE = 4  # Interactive mode (user questions)
+    
+    @property
+    def value_str(self) -> str:
+        """Name of the mode on the command line (basic, full, interactive)."""
+        return self.name.lower()
+    
+    @classmethod
+    def from_str(cls, value: str) -> "AnalysisMode":
+        """Get the mode from its command line name."""
+        return cls[value.upper()]
+
+# Modes that run timbre analysis and tag/genre/quality suggestions
+FULL_ANALYSIS_MODES = AnalysisMode.FULL | AnalysisMode.INTERACTIVE
 
 def setup_argparse() -> argparse.ArgumentParser:
     """
@@ -148,8 +193,8 @@ def setup_argparse() -> argparse.ArgumentParser:
     parser.add_argument(
         "-m", "--mode",
         help="Analysis mode",
-        choices=[mode.value for mode in AnalysisMode],
-        default=AnalysisMode.FULL.value
+        choices=[mode.value_str for mode in AnalysisMode],
+        default=AnalysisMode.FULL.value_str
     )
     
     parser.add_argument(
@@ -158,6 +203,12 @@ def setup_argparse() -> argparse.ArgumentParser:
         action="store_true"
     )
     
+    parser.add_argument(
+        "--no-dir-cache",
+        help="Scan the directory without reading or writing the directory listing cache",
+        action="store_true"
+    )
+    
     parser.add_argument(
         "-f", "--force",
         help="Force reanalysis even for already annotated soundfonts",
@@ -176,6 +227,18 @@ def setup_argparse() -> argparse.ArgumentParser:
         default=None  # Will be auto-detected
     )
     
+    parser.add_argument(
+        "--fluidsynth-subprocess",
+        help="Render sound tests with the FluidSynth executable instead of pyfluidsynth",
+        action="store_true"
+    )
+    
+    parser.add_argument(
+        "--install-audio",
+        help="Install pygame with pip if no audio playback library is available",
+        action="store_true"
+    )
+    
     parser.add_argument(
         "--scan",
         help="Scan directory and automatically add new soundfonts",
@@ -194,6 +257,12 @@ def setup_argparse() -> argparse.ArgumentParser:
         action="store_true"
     )
     
+    parser.add_argument(
+        "-q", "--quiet",
+        help="No colors and no per-soundfont progress messages",
+        action="store_true"
+    )
+    
     parser.add_argument(
         "--batch-size",
         help="Number of soundfonts to process before saving (for large collections)",
@@ -201,12 +270,26 @@ def setup_argparse() -> argparse.ArgumentParser:
         default=10
     )
     
+    parser.add_argument(
+        "-j", "--jobs",
+        help="Number of worker processes for non-interactive annotation (1 = in-process)",
+        type=int,
+        default=os.cpu_count() or 1
+    )
+    
     parser.add_argument(
         "--no-timbre-analysis",
         help="Skip timbre analysis (faster processing)",
         action="store_true"
     )
     
+    parser.add_argument(
+        "--no-parallel-analysis",
+        help="Run note range test and timbre analysis one after the other (for debugging; "
+             "they only overlap when rendering with the FluidSynth executable, without pyfluidsynth)",
+        action="store_true"
+    )
+    
     parser.add_argument(
         "--quality-threshold",
         help="Manually set threshold for quality classification (0-1)",
@@ -231,23 +314,43 @@ def setup_argparse() -> argparse.ArgumentParser:
     
     return parser
 
+@lru_cache(maxsize=1)
 def check_fluidsynth_available():
     """
     Check if FluidSynth is available in the system path.
     
+    The PATH lookup does not start a process and is done once per run.
+    
     Returns:
         True if FluidSynth is available, False otherwise
     """
-    try:
-        result = subprocess.run(
-            ['fluidsynth', '--version'], 
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.PIPE,
-            text=True
-        )
-        return result.returncode == 0
-    except:
-        return False
+    return shutil.which('fluidsynth') is not None
+
+@lru_cache(maxsize=1)
+def _session_tmpdir() -> str:
+    """
+    Get the temporary directory shared by all sound tests of this run.
+    
+    The test files are thrown away, so on Linux the directory is created in
+    the RAM-backed /dev/shm when available.
+    
+    Returns:
+        Path of the directory, removed when the program exits
+    """
+    shm_dir = "/dev/shm"
+    base_dir = shm_dir if os.path.isdir(shm_dir) and os.access(shm_dir, os.W_OK) else None
+    tmp_dir = tempfile.mkdtemp(prefix="sf_annot_", dir=base_dir)
+    atexit.register(shutil.rmtree, tmp_dir, ignore_errors=True)
+    return tmp_dir
+
+def _test_wav_path(soundfont_path: str) -> str:
+    """
+    Path of the sound test WAV of a soundfont: one per soundfont in the session
+    directory (the path hash avoids collisions between soundfonts with the same
+    name in different folders).
+    """
+    path_hash = hashlib.blake2s(os.path.abspath(soundfont_path).encode("utf-8"), digest_size=4).hexdigest()
+    return os.path.join(_session_tmpdir(), f"{os.path.basename(soundfont_path)}.{path_hash}.wav")
 
 def play_soundfont_test(soundfont_path: str, audio_driver: Optional[str] = None, debug: bool = False) -> bool:
     """
@@ -261,26 +364,28 @@ def play_soundfont_test(soundfont_path: str, audio_driver: Optional[str] = None,
     Returns:
         True if playback was successful, False otherwise
     """
+    from sound_test import play_wav_simple
+    
     # Check audio dependencies first
     audio_available = check_audio_dependencies(debug)
     if not audio_available and debug:
-        print(Fore.YELLOW + "No audio library found. Playback may be limited." + Style.RESET_ALL)
+        print(_y("No audio library found. Playback may be limited."))
     
-    print(Fore.YELLOW + "\nGenerating soundfont test..." + Style.RESET_ALL)
-    print(Fore.YELLOW + "Please wait, this may take a few seconds." + Style.RESET_ALL)
+    print(_y("\nGenerating soundfont test..."))
+    print(_y("Please wait, this may take a few seconds."), flush=True)
     
-    # Create a temporary directory
-    temp_dir = tempfile.mkdtemp()
-    wav_path = os.path.join(temp_dir, "soundfont_test.wav")
-    
-    # Generate the WAV file
-    success = test_soundfont_simple(soundfont_path, wav_path, debug)
+    # Generate the WAV file, unless it was already rendered in the background
+    wav_path = _test_wav_path(soundfont_path)
+    if os.path.isfile(wav_path) and os.path.getsize(wav_path) > 0:
+        success = True
+    else:
+        success = test_soundfont_simple(soundfont_path, wav_path, debug)
     
     if success:
-        print(Fore.GREEN + "Soundfont test completed successfully!" + Style.RESET_ALL)
+        print(_g("Soundfont test completed successfully!"))
         
         if debug:
-            print(Fore.CYAN + f"Generated WAV file: {wav_path}" + Style.RESET_ALL)
+            print(_c(f"Generated WAV file: {wav_path}"))
         
         # Ask if the user wants to hear the sound
         play_sound = validate_and_get_input(
@@ -290,54 +395,118 @@ def play_soundfont_test(soundfont_path: str, audio_driver: Optional[str] = None,
         )
         
         if play_sound.lower() == "y":
-            played = play_wav_simple(wav_path, debug)
+            played = False
+            # Play the test MIDI through fluidsynth_helper's cached synth; the WAV is the fallback
+            if not _USE_FLUIDSYNTH_SUBPROCESS and _pyfluidsynth_available():
+                from fluidsynth_helper import play_soundfont
+                
+                played = play_soundfont(soundfont_path, _test_midi_path(), audio_driver,
+                                        gain=0.7, verbose=debug)
+                if not played and debug:
+                    print(_y("Live playback failed, playing the WAV file instead"))
+            if not played:
+                played = play_wav_simple(wav_path, debug)
             
             if not played:
-                print(Fore.YELLOW + "Unable to play the sound automatically." + Style.RESET_ALL)
-                print(Fore.YELLOW + f"You can find the test file at: {wav_path}" + Style.RESET_ALL)
+                print(_y("Unable to play the sound automatically."))
+                print(_y(f"You can find the test file at: {wav_path}"))
                 
                 # Suggest alternative options
                 system = platform.system().lower()
                 if system == 'linux':
-                    print(Fore.YELLOW + "Try playing manually with: aplay " + wav_path + Style.RESET_ALL)
+                    print(_y("Try playing manually with: aplay " + wav_path))
                 elif system == 'darwin':
-                    print(Fore.YELLOW + "Try playing manually with: afplay " + wav_path + Style.RESET_ALL)
+                    print(_y("Try playing manually with: afplay " + wav_path))
                 elif system == 'windows':
-                    print(Fore.YELLOW + "Try opening the file with the default Windows audio player." + Style.RESET_ALL)
+                    print(_y("Try opening the file with the default Windows audio player."))
     else:
-        print(Fore.RED + "Failed to generate the sound test for this soundfont." + Style.RESET_ALL)
+        print(_r("Failed to generate the sound test for this soundfont."))
         if debug:
-            print(Fore.RED + "Make sure FluidSynth is installed correctly and the soundfont is valid." + Style.RESET_ALL)
+            print(_r("Make sure FluidSynth is installed correctly and the soundfont is valid."))
     
     return success
 
-def list_soundfonts(directory: str, recursive: bool = False) -> List[str]:
+# Directory listings of previous runs, keyed by directory and recursive flag
+DIRLIST_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "sf_annotator", "dirlist.json")
+
+# Listings kept in DIRLIST_CACHE_FILE; the least recently scanned go first
+DIRLIST_CACHE_MAX_ENTRIES = 100
+
+def _dir_mtime(dir_path: str) -> Optional[int]:
+    """Modification time of a directory in ns, or None if it can't be read."""
+    try:
+        return os.stat(dir_path).st_mtime_ns
+    except OSError:
+        return None
+
+def list_soundfonts(directory: str, recursive: bool = False, use_cache: bool = True) -> List[str]:
     """
     List all .sf2 files in the specified directory.
     
+    The listing is cached in DIRLIST_CACHE_FILE together with the modification
+    time of every directory scanned; it is reused while none of them changed
+    (adding or removing a file or subdirectory changes its parent's mtime).
+    At most DIRLIST_CACHE_MAX_ENTRIES listings are kept, and the file is only
+    written when a listing changed.
+    
     Args:
         directory: Directory to scan
         recursive: If True, search in subdirectories
+        use_cache: If False, scan without reading or writing DIRLIST_CACHE_FILE
         
     Returns:
         List of paths to .sf2 files
     """
-    sf2_files = []
+    cache = load_analysis_cache(DIRLIST_CACHE_FILE) if use_cache else {}
+    cache_key = json.dumps([os.path.abspath(directory), recursive])
+    cached = cache.get(cache_key)
+    if cached is not None and all(_dir_mtime(d) == m for d, m in cached["dirs"].items()):
+        return [os.path.join(directory, rel) for rel in cached["files"]]
+    
+    dir_mtimes = {}
+    
+    def walk(dir_path: str):
+        dir_mtimes[os.path.abspath(dir_path)] = _dir_mtime(dir_path)
+        # scandir entries carry the file type from the directory read,
+        # so no extra stat() per entry
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            yield from walk(entry.path)
+                    elif entry.name.endswith(SF2_SUFFIXES) and entry.is_file():
+                        yield entry.path
+        except PermissionError as e:
+            # Skip unreadable subdirectories, keep scanning the rest
+            if dir_path == directory:
+                raise
+            print(_y(f"Skipping unreadable directory: {e}"))
     
     try:
-        if recursive:
-            for root, _, files in os.walk(directory):
-                for file in files:
-                    if file.lower().endswith('.sf2'):
-                        sf2_files.append(os.path.join(root, file))
-        else:
-            for file in os.listdir(directory):
-                if file.lower().endswith('.sf2'):
-                    sf2_files.append(os.path.join(directory, file))
+        soundfonts = sorted(walk(directory))
     except Exception as e:
-        print(Fore.RED + f"Error scanning directory: {e}" + Style.RESET_ALL)
+        print(_r(f"Error scanning directory: {e}"))
+        return []
+    
+    listing = {
+        "dirs": dir_mtimes,
+        "files": [os.path.relpath(path, directory) for path in soundfonts]
+    }
+    if not use_cache or listing == cached:
+        return soundfonts
+    
+    # A rescanned directory moves to the end, as the most recently scanned
+    cache.pop(cache_key, None)
+    cache[cache_key] = listing
+    _trim_analysis_cache(cache, DIRLIST_CACHE_MAX_ENTRIES)
+    try:
+        os.makedirs(os.path.dirname(DIRLIST_CACHE_FILE), exist_ok=True)
+        save_analysis_cache(cache, DIRLIST_CACHE_FILE)
+    except OSError:
+        pass
     
-    return sorted(sf2_files)
+    return soundfonts
 
 def validate_and_get_input(prompt: str, options: Optional[List[str]] = None, default: Optional[str] = None) -> str:
     """
@@ -351,24 +520,23 @@ def validate_and_get_input(prompt: str, options: Optional[List[str]] = None, def
     Returns:
         Validated user input
     """
-    # Add information about default value and options to the prompt
-    display_prompt = prompt
-    if options:
-        display_prompt += f" [{'/'.join(options)}]"
-    if default is not None:
-        display_prompt += f" (default: {default})"
-    display_prompt += ": "
+    # Add information about default value and options to the prompt (built once)
+    options_text = f" [{'/'.join(options)}]" if options else ""
+    default_text = f" (default: {default})" if default is not None else ""
+    display_prompt = _c(f"{prompt}{options_text}{default_text}: ")
+    invalid_message = _r("Invalid input.") + "\n"
+    options_set = frozenset(options) if options else None
     
     while True:
-        user_input = input(Fore.CYAN + display_prompt + Style.RESET_ALL)
+        user_input = input(display_prompt)
         
         # If input is empty and there's a default, use the default
         if not user_input and default is not None:
             return default
         
-        # If there are options, validate the input
-        if options and user_input and user_input not in options:
-            print(Fore.RED + f"Invalid input. Choose from: {', '.join(options)}" + Style.RESET_ALL)
+        # If there are options, validate the input (the prompt already lists them)
+        if options_set and user_input and user_input not in options_set:
+            sys.stdout.write(invalid_message)
             continue
         
         return user_input
@@ -383,12 +551,12 @@ def get_manual_metadata(existing_metadata: Dict) -> Dict:
     Returns:
         Dictionary with collected metadata
     """
-    print(Fore.YELLOW + "\n=== Collecting Metadata Manually ===" + Style.RESET_ALL)
+    print(_y("\n=== Collecting Metadata Manually ==="))
     
     metadata = {}
     
     # Descriptive information with default values from existing metadata
-    metadata['name'] = input(Fore.CYAN + f"Soundfont Name (default: {existing_metadata.get('name', '')}): " + Style.RESET_ALL) or existing_metadata.get('name', '')
+    metadata['name'] = input(_c(f"Soundfont Name (default: {existing_metadata.get('name', '')}): ")) or existing_metadata.get('name', '')
     
     # For timbre, we need to consider if it's a string or a dictionary
     default_timbre = ""
@@ -398,15 +566,15 @@ def get_manual_metadata(existing_metadata: Dict) -> Dict:
         timbre_info = existing_metadata.get('timbre', {})
         default_timbre = f"{timbre_info.get('brightness', '')} {timbre_info.get('richness', '')} {timbre_info.get('harmonic_quality', '')}".strip()
     
-    metadata['timbre'] = input(Fore.CYAN + f"Timbre Description (default: {default_timbre}): " + Style.RESET_ALL) or default_timbre
+    metadata['timbre'] = input(_c(f"Timbre Description (default: {default_timbre}): ")) or default_timbre
     
     # Tags as list
     default_tags = ", ".join(existing_metadata.get('tags', []))
-    tags_input = input(Fore.CYAN + f"Tags (comma separated) (default: {default_tags}): " + Style.RESET_ALL) or default_tags
-    metadata['tags'] = [tag.strip() for tag in tags_input.split(',') if tag.strip()]
+    tags_input = input(_c(f"Tags (comma separated) (default: {default_tags}): ")) or default_tags
+    metadata['tags'] = list(filter(None, map(str.strip, tags_input.split(','))))
     
     # Instrument type
-    metadata['instrument_type'] = input(Fore.CYAN + f"Instrument Type (default: {existing_metadata.get('instrument_type', '')}): " + Style.RESET_ALL) or existing_metadata.get('instrument_type', '')
+    metadata['instrument_type'] = input(_c(f"Instrument Type (default: {existing_metadata.get('instrument_type', '')}): ")) or existing_metadata.get('instrument_type', '')
     
     # Quality
     quality_options = ["high", "medium", "low"]
@@ -418,45 +586,273 @@ def get_manual_metadata(existing_metadata: Dict) -> Dict:
     
     # Genres as list
     default_genres = ", ".join(existing_metadata.get('genre', []))
-    genres_input = input(Fore.CYAN + f"Musical Genres (comma separated) (default: {default_genres}): " + Style.RESET_ALL) or default_genres
-    metadata['genre'] = [genre.strip() for genre in genres_input.split(',') if genre.strip()]
+    genres_input = input(_c(f"Musical Genres (comma separated) (default: {default_genres}): ")) or default_genres
+    metadata['genre'] = list(filter(None, map(str.strip, genres_input.split(','))))
     
     # License
-    metadata['license'] = input(Fore.CYAN + f"License (default: {existing_metadata.get('license', '')}): " + Style.RESET_ALL) or existing_metadata.get('license', '')
+    metadata['license'] = input(_c(f"License (default: {existing_metadata.get('license', '')}): ")) or existing_metadata.get('license', '')
     
     # Author
-    metadata['author'] = input(Fore.CYAN + f"Author (default: {existing_metadata.get('author', '')}): " + Style.RESET_ALL) or existing_metadata.get('author', '')
+    metadata['author'] = input(_c(f"Author (default: {existing_metadata.get('author', '')}): ")) or existing_metadata.get('author', '')
     
     # Description
-    metadata['description'] = input(Fore.CYAN + f"Description (default: {existing_metadata.get('description', '')}): " + Style.RESET_ALL) or existing_metadata.get('description', '')
+    metadata['description'] = input(_c(f"Description (default: {existing_metadata.get('description', '')}): ")) or existing_metadata.get('description', '')
     
     # Technical information (only if no existing data)
     if not existing_metadata.get('mapped_notes'):
-        print(Fore.YELLOW + "\n=== Technical Information (optional) ===" + Style.RESET_ALL)
-        print(Fore.CYAN + "Leave blank to skip or use automatically detected values." + Style.RESET_ALL)
+        print(_y("\n=== Technical Information (optional) ==="))
+        print(_c("Leave blank to skip or use automatically detected values."))
         
         mapped_notes = {}
-        min_note = input(Fore.CYAN + "Lowest note (e.g., A0): " + Style.RESET_ALL)
+        min_note = input(_c("Lowest note (e.g., A0): "))
         if min_note:
             mapped_notes['min_note'] = min_note
             
-        max_note = input(Fore.CYAN + "Highest note (e.g., C8): " + Style.RESET_ALL)
+        max_note = input(_c("Highest note (e.g., C8): "))
         if max_note:
             mapped_notes['max_note'] = max_note
             
-        missing_notes = input(Fore.CYAN + "Missing notes (comma separated): " + Style.RESET_ALL)
+        missing_notes = input(_c("Missing notes (comma separated): "))
         if missing_notes:
-            mapped_notes['missing_notes'] = [note.strip() for note in missing_notes.split(',') if note.strip()]
+            mapped_notes['missing_notes'] = list(filter(None, map(str.strip, missing_notes.split(','))))
         
         if mapped_notes:
             metadata['mapped_notes'] = mapped_notes
     
     return metadata
 
+def _analyze_soundfont(soundfont_path: str, mode: AnalysisMode, insert_data: bool = False,
+                       debug: bool = False, skip_timbre: bool = False,
+                       quality_threshold: Optional[float] = None,
+                       test_note_range: bool = False,
+                       parallel_analysis: bool = True) -> Dict:
+    """
+    Run the automatic analysis of a soundfont, without touching the database.
+    
+    Args:
+        soundfont_path: Path to the .sf2 file
+        mode: Analysis mode
+        insert_data: If True, run the full analysis as for interactive mode
+        debug: If True, print more detailed error information
+        skip_timbre: If True, skip timbre analysis
+        quality_threshold: Override threshold for quality classification
+        test_note_range: If True, perform comprehensive note range test
+        parallel_analysis: If True, run note range test and timbre analysis concurrently
+                           (FluidSynth executable only)
+        
+    Returns:
+        Dictionary with the automatically detected metadata
+    """
+    from soundfont_utils import add_tested_note_range, analyze_soundfont_full
+    
+    full_analysis = bool(mode & FULL_ANALYSIS_MODES) or insert_data
+    
+    if test_note_range:
+        _info("\nTesting note range (this may take a minute)...", "yellow", flush=True)
+    
+    # Automatically extract (and in the full modes analyze) the metadata
+    if full_analysis:
+        auto_metadata = analyze_soundfont_full(soundfont_path, skip_timbre, test_note_range,
+                                               parallel_analysis)
+        if debug:
+            print(f"Final tags: {auto_metadata['tags']}")
+    else:
+        auto_metadata = extract_sf2_metadata(soundfont_path)
+        if test_note_range:
+            add_tested_note_range(auto_metadata, soundfont_path)
+    
+    if "path" not in auto_metadata:
+        auto_metadata["path"] = soundfont_path
+    
+    # Validate size_mb - make sure it's a positive number
+    if auto_metadata.get("size_mb", 0) <= 0:
+        # Try to get the size directly
+        try:
+            size_mb = os.path.getsize(soundfont_path) / (1024 * 1024)
+            auto_metadata["size_mb"] = round(size_mb, 2)
+        except Exception as e:
+            if debug:
+                print(_r(f"Debug - Error getting file size: {e}"))
+    
+    # A more direct quality assignment based on size; in batch (FULL) mode
+    # it is done for the whole batch by _run_batch instead
+    if full_analysis and quality_threshold is not None:
+        if mode & AnalysisMode.INTERACTIVE or insert_data:
+            auto_metadata["quality"] = str(size_quality_labels(
+                [auto_metadata.get("size_mb", 0)], quality_threshold)[0])
+    
+    return auto_metadata
+
+# Quality labels by size band (see size_quality_labels)
+QUALITY_LABELS = ("low", "medium", "high")
+
+def size_quality_labels(sizes_mb, quality_threshold: float) -> "np.ndarray":
+    """
+    Classify soundfonts by size: above 30x the threshold (in MB) is high,
+    above 10x is medium, anything else is low.
+    
+    Args:
+        sizes_mb: Sizes of the soundfonts in MB
+        quality_threshold: Threshold for quality classification
+        
+    Returns:
+        Array with the quality label of each size
+    """
+    import numpy as np
+    
+    edges = np.array([quality_threshold * 10, quality_threshold * 30])
+    return np.array(QUALITY_LABELS)[np.searchsorted(edges, np.asarray(sizes_mb, dtype=float))]
+
+# Sidecar file (next to the output database) with previous analysis results
+ANALYSIS_CACHE_FILE = ".sf_annotator_cache.json"
+
+# Entries kept in the analysis cache; the least recently used go first. Keys of
+# files that changed or were removed are never hit again and age out this way.
+ANALYSIS_CACHE_MAX_ENTRIES = 20000
+
+def _analysis_cache_path(output_file: str) -> str:
+    """Path of the analysis cache that belongs to an output database."""
+    return os.path.join(os.path.dirname(os.path.abspath(output_file)), ANALYSIS_CACHE_FILE)
+
+def load_analysis_cache(cache_path: str) -> Dict:
+    """
+    Load cached analysis results.
+    
+    Args:
+        cache_path: Path to the cache file
+        
+    Returns:
+        Dictionary mapping cache keys to metadata (empty if missing or unreadable)
+    """
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_analysis_cache(cache: Dict, cache_path: str) -> bool:
+    """
+    Save cached analysis results.
+    
+    Args:
+        cache: Dictionary mapping cache keys to metadata
+        cache_path: Path to the cache file
+        
+    Returns:
+        True if save was successful, False otherwise
+    """
+    try:
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False)
+        return True
+    except (OSError, TypeError, ValueError):
+        return False
+
+def _get_cached_analysis(cache: Dict, cache_key: str) -> Optional[Dict]:
+    """
+    Get a cached analysis, marking it as the most recently used.
+    
+    Args:
+        cache: Analysis cache (dicts keep insertion order, oldest first)
+        cache_key: Key built by _analysis_cache_key
+        
+    Returns:
+        Cached metadata, or None if the key is not in the cache
+    """
+    metadata = cache.pop(cache_key, None)
+    if metadata is not None:
+        cache[cache_key] = metadata
+    return metadata
+
+def _trim_analysis_cache(cache: Dict, max_entries: int = ANALYSIS_CACHE_MAX_ENTRIES) -> None:
+    """Drop the least recently used entries so that at most max_entries remain."""
+    for cache_key in list(islice(cache, max(0, len(cache) - max_entries))):
+        del cache[cache_key]
+
+def _analysis_cache_key(soundfont_path: str, *options) -> Optional[str]:
+    """
+    Build the cache key of a soundfont: its absolute path, size and modification
+    time, plus the analysis options that affect the result.
+    
+    Returns:
+        Cache key, or None if the file cannot be accessed
+    """
+    try:
+        st = os.stat(soundfont_path)
+    except OSError:
+        return None
+    return json.dumps([os.path.abspath(soundfont_path), st.st_size, st.st_mtime_ns, *options])
+
+def _register_soundfont(manager: SoundfontManager, metadata: Dict, soundfont_path: str,
+                        rebuild_indices: bool = True) -> SoundfontMetadata:
+    """
+    Add an analyzed soundfont to the manager.
+    
+    Args:
+        manager: SoundfontManager instance
+        metadata: Metadata of the soundfont (as returned by _analyze_soundfont)
+        soundfont_path: Path to the .sf2 file
+        rebuild_indices: If False, the caller must call manager._build_indices() later
+        
+    Returns:
+        SoundfontMetadata object added to the manager
+    """
+    rel_path = manager._get_relative_path(soundfont_path)
+    
+    # Creating a complete object with all metadata
+    sf = SoundfontMetadata.from_dict({
+        "polyphony": 32,
+        **metadata,
+        "id": manager.next_id,
+        "path": rel_path
+    })
+    
+    # Add to the manager
+    manager.add_soundfont_deferred(sf)
+    if rebuild_indices:
+        manager._build_indices()
+    
+    return sf
+
+def _annotate_one(soundfont_path: str, mode_value: int, skip_timbre: bool,
+                  quality_threshold: Optional[float], test_note_range: bool,
+                  debug: bool = False, parallel_analysis: bool = True,
+                  insert_data: bool = False) -> Dict:
+    """
+    Process pool worker: analyze one soundfont in a child process.
+    
+    Only picklable values go in and out; the parent adds the result to the
+    manager with _register_soundfont.
+    
+    Args:
+        soundfont_path: Path to the .sf2 file
+        mode_value: Integer value of the AnalysisMode to use
+        skip_timbre: If True, skip timbre analysis
+        quality_threshold: Override threshold for quality classification
+        test_note_range: If True, perform comprehensive note range test
+        debug: If True, print more detailed error information
+        parallel_analysis: If True, run note range test and timbre analysis concurrently
+                           (FluidSynth executable only)
+        insert_data: If True, run the full analysis as for interactive mode
+        
+    Returns:
+        Dictionary with the automatically detected metadata
+    """
+    try:
+        return _analyze_soundfont(soundfont_path, AnalysisMode(mode_value), insert_data, debug,
+                                  skip_timbre, quality_threshold, test_note_range,
+                                  parallel_analysis)
+    finally:
+        # The worker inherits the parent's block-buffered stdout
+        sys.stdout.flush()
+
 def annotate_soundfont(soundfont_path: str, manager: SoundfontManager, mode: AnalysisMode, 
                       play_test: bool, insert_data: bool = False, debug: bool = False,
                       skip_timbre: bool = False, quality_threshold: Optional[float] = None,
-                      audio_driver: Optional[str] = None, test_note_range: bool = False) -> Optional[SoundfontMetadata]:
+                      audio_driver: Optional[str] = None, test_note_range: bool = False,
+                      analysis_cache: Optional[Dict] = None, force: bool = False,
+                      parallel_analysis: bool = True,
+                      rebuild_indices: bool = True) -> Optional[SoundfontMetadata]:
     """
     Annotate a soundfont with metadata.
     
@@ -471,133 +867,65 @@ def annotate_soundfont(soundfont_path: str, manager: SoundfontManager, mode: Ana
         quality_threshold: Override threshold for quality classification
         audio_driver: Audio driver for FluidSynth to use
         test_note_range: If True, perform comprehensive note range test
+        analysis_cache: Cache of previous analysis results, updated in place (optional)
+        force: If True, ignore cached results and analyze again
+        parallel_analysis: If True, run note range test and timbre analysis concurrently
+                           (FluidSynth executable only)
+        rebuild_indices: If False, the caller must call manager._build_indices() later
         
     Returns:
         SoundfontMetadata object of the annotated soundfont or None on error
     """
-    print(Fore.GREEN + f"\nAnnotating: {soundfont_path}" + Style.RESET_ALL)
+    _info(f"\nAnnotating: {soundfont_path}", flush=True)
     
     try:
-        # Automatically extract basic metadata
-        auto_metadata = extract_sf2_metadata(soundfont_path)
-
-        original_tags = auto_metadata.get("tags", [])
-
-        filename = os.path.basename(soundfont_path)
-        if "path" not in auto_metadata:
-            auto_metadata["path"] = soundfont_path
+        # Reuse a previous analysis if the file is unchanged
+        cache_key = None
+        auto_metadata = None
+        if analysis_cache is not None:
+            cache_key = _analysis_cache_key(soundfont_path, mode.value_str, insert_data, skip_timbre,
+                                            quality_threshold, test_note_range)
+            if cache_key and not force:
+                auto_metadata = _get_cached_analysis(analysis_cache, cache_key)
+                if auto_metadata is not None and debug:
+                    print(_c("Debug - Using cached analysis"))
         
-        # Validate size_mb - make sure it's a positive number
-        if auto_metadata.get("size_mb", 0) <= 0:
-            # Try to get the size directly
-            try:
-                size_mb = os.path.getsize(soundfont_path) / (1024 * 1024)
-                auto_metadata["size_mb"] = round(size_mb, 2)
-            except Exception as e:
-                if debug:
-                    print(Fore.RED + f"Debug - Error getting file size: {e}" + Style.RESET_ALL)
-        
-        # Test note range if requested
-        if test_note_range:
-            print(Fore.YELLOW + "\nTesting note range (this may take a minute)..." + Style.RESET_ALL)
-            try:
-                min_note, max_note, missing_notes = test_note_range(soundfont_path)
-                
-                # Update metadata with tested note mapping
-                if "mapped_notes" not in auto_metadata:
-                    auto_metadata["mapped_notes"] = {}
-                
-                auto_metadata["mapped_notes"]["min_note"] = min_note
-                auto_metadata["mapped_notes"]["max_note"] = max_note
-                auto_metadata["mapped_notes"]["missing_notes"] = missing_notes
-                
-                print(Fore.GREEN + f"Note range test complete: {min_note} to {max_note}" + Style.RESET_ALL)
-            except Exception as e:
-                if debug:
-                    print(Fore.RED + f"Debug - Note range test failed: {e}" + Style.RESET_ALL)
-                    import traceback
-                    traceback.print_exc()
-        
-        # Depending on the mode, do additional analysis
-        if mode == AnalysisMode.FULL or mode == AnalysisMode.INTERACTIVE or insert_data:
-            # Analyze timbre
-            if not skip_timbre:
-                try:
-                    timbre_info = analyze_timbre(soundfont_path)
-                    auto_metadata["timbre"] = timbre_info
-                except Exception as e:
-                    if debug:
-                        print(Fore.RED + f"Debug - Timbre analysis failed: {e}" + Style.RESET_ALL)
-                    # Continue with default timbre info
-                    auto_metadata["timbre"] = {
-                        "brightness": "medium",
-                        "richness": "medium",
-                        "attack": "medium",
-                        "harmonic_quality": "balanced"
-                    }
-            else:
-                # Use default timbre info
-                auto_metadata["timbre"] = {
-                    "brightness": "medium",
-                    "richness": "medium",
-                    "attack": "medium",
-                    "harmonic_quality": "balanced"
-                }
-            
-            # Suggest tags
-            suggested_tags = generate_tag_suggestions(auto_metadata)
-            # auto_metadata["tags"] = generate_tag_suggestions(auto_metadata)
-            if debug:
-                print(f"Original tags: {original_tags}")
-                print(f"Suggested tags: {suggested_tags}")
-            
-            all_tags = set(original_tags)
-            all_tags.update(suggested_tags)
-
-            auto_metadata["tags"] = sorted(list(all_tags))
-            if debug:
-                print(f"Final tags: {auto_metadata['tags']}")
-            
-            # Suggest genres
-            auto_metadata["genre"] = suggest_genres(auto_metadata["timbre"])
-            
-            # Suggest quality - with optional threshold override
-            if quality_threshold is not None:
-                # A more direct quality assignment based on size
-                size_mb = auto_metadata.get("size_mb", 0)
-                if size_mb > quality_threshold * 30:
-                    auto_metadata["quality"] = "high"
-                elif size_mb > quality_threshold * 10:
-                    auto_metadata["quality"] = "medium"
-                else:
-                    auto_metadata["quality"] = "low"
-            else:
-                auto_metadata["quality"] = suggest_quality(auto_metadata)
+        # Automatically extract and analyze metadata
+        if auto_metadata is None:
+            auto_metadata = _analyze_soundfont(
+                soundfont_path, mode, insert_data, debug,
+                skip_timbre, quality_threshold, test_note_range,
+                parallel_analysis
+            )
+            if cache_key:
+                analysis_cache[cache_key] = auto_metadata
         
         # Interactive or insert_data mode
-        if mode == AnalysisMode.INTERACTIVE or insert_data:
+        if mode & AnalysisMode.INTERACTIVE or insert_data:
             # Play the soundfont if requested
             if play_test:
                 play_success = play_soundfont_test(soundfont_path, audio_driver, debug)
                 if not play_success and debug:
-                    print(Fore.YELLOW + "Warning: Failed to play soundfont test" + Style.RESET_ALL)
+                    print(_y("Warning: Failed to play soundfont test"))
             
             # Show automatically detected metadata
-            print(Fore.YELLOW + "\n=== Automatically Detected Metadata ===" + Style.RESET_ALL)
-            for key, value in auto_metadata.items():
-                if key != "mapped_notes" and key != "timbre":
-                    print(Fore.CYAN + f"{key}: " + Style.RESET_ALL + f"{value}")
+            lines = [_y("\n=== Automatically Detected Metadata ===")]
+            lines.extend(_c(f"{key}: ") + f"{value}" for key, value in auto_metadata.items()
+                         if key != "mapped_notes" and key != "timbre")
             
             if "mapped_notes" in auto_metadata:
-                print(Fore.CYAN + "mapped_notes: " + Style.RESET_ALL)
-                for key, value in auto_metadata["mapped_notes"].items():
-                    print(Fore.CYAN + f"  {key}: " + Style.RESET_ALL + f"{value}")
+                lines.append(_c("mapped_notes: "))
+                lines.extend(_c(f"  {key}: ") + f"{value}"
+                             for key, value in auto_metadata["mapped_notes"].items())
             
             if "timbre" in auto_metadata and isinstance(auto_metadata["timbre"], dict):
-                print(Fore.CYAN + "timbre: " + Style.RESET_ALL)
-                for key, value in auto_metadata["timbre"].items():
-                    if not key.startswith("spectral_") and not key == "mfcc_features":
-                        print(Fore.CYAN + f"  {key}: " + Style.RESET_ALL + f"{value}")
+                lines.append(_c("timbre: "))
+                lines.extend(_c(f"  {key}: ") + f"{value}"
+                             for key, value in auto_metadata["timbre"].items()
+                             if not key.startswith("spectral_") and not key == "mfcc_features")
+            
+            # One write for the whole block
+            print("\n".join(lines))
             
             # Ask if user wants to edit the metadata
             edit = validate_and_get_input(
@@ -613,134 +941,24 @@ def annotate_soundfont(soundfont_path: str, manager: SoundfontManager, mode: Ana
                 # (manual metadata takes precedence)
                 merged_metadata = {**auto_metadata, **manual_metadata}
                 
-                # Create a new SoundfontMetadata object with the merged data
-                mapped_notes = merged_metadata.get("mapped_notes", {})
-                if mapped_notes:
-                    mapped_notes_obj = MappedNotes(
-                        min_note=mapped_notes.get("min_note", "C0"),
-                        max_note=mapped_notes.get("max_note", "C8"),
-                        missing_notes=mapped_notes.get("missing_notes", [])
-                    )
-                else:
-                    mapped_notes_obj = MappedNotes()
-                
-                # Create the soundfont metadata object from merged data
-                sf = SoundfontMetadata(
-                    id=manager.next_id,
-                    name=merged_metadata.get("name", ""),
-                    path=manager._get_relative_path(soundfont_path),
-                    timbre=merged_metadata.get("timbre", ""),
-                    tags=merged_metadata.get("tags", []),
-                    instrument_type=merged_metadata.get("instrument_type", ""),
-                    quality=merged_metadata.get("quality", "medium"),
-                    genre=merged_metadata.get("genre", []),
-                    mapped_notes=mapped_notes_obj,
-                    polyphony=merged_metadata.get("polyphony", 32),
-                    sample_rate=merged_metadata.get("sample_rate", 44100),
-                    bit_depth=merged_metadata.get("bit_depth", 16),
-                    size_mb=merged_metadata.get("size_mb", 0.0),
-                    license=merged_metadata.get("license", ""),
-                    author=merged_metadata.get("author", ""),
-                    description=merged_metadata.get("description", ""),
-                    hash=merged_metadata.get("hash", ""),
-                    last_modified=merged_metadata.get("last_modified", 0.0)
-                )
-                
-                # Add the soundfont to the manager
-                manager.soundfonts.append(sf)
-                manager.next_id += 1
-                manager._build_indices()
-                
-                return sf
+                return _register_soundfont(manager, merged_metadata, soundfont_path, rebuild_indices)
             else:
-                rel_path = manager._get_relative_path(soundfont_path)
-                
-                # Creating a complete object with all metadata
-                mapped_notes = auto_metadata.get("mapped_notes", {})
-                mapped_notes_obj = MappedNotes(
-                    min_note=mapped_notes.get("min_note", "C0"),
-                    max_note=mapped_notes.get("max_note", "C8"),
-                    missing_notes=mapped_notes.get("missing_notes", [])
-                )
-                
-                sf = SoundfontMetadata(
-                    id=manager.next_id,
-                    name=auto_metadata.get("name", ""),
-                    path=rel_path,
-                    timbre=auto_metadata.get("timbre", ""),
-                    tags=auto_metadata.get("tags", []),
-                    instrument_type=auto_metadata.get("instrument_type", ""),
-                    quality=auto_metadata.get("quality", "medium"),
-                    genre=auto_metadata.get("genre", []),
-                    mapped_notes=mapped_notes_obj,
-                    polyphony=auto_metadata.get("polyphony", 32),
-                    sample_rate=auto_metadata.get("sample_rate", 44100),
-                    bit_depth=auto_metadata.get("bit_depth", 16),
-                    size_mb=auto_metadata.get("size_mb", 0.0),
-                    license=auto_metadata.get("license", ""),
-                    author=auto_metadata.get("author", ""),
-                    description=auto_metadata.get("description", ""),
-                    hash=auto_metadata.get("hash", ""),
-                    last_modified=auto_metadata.get("last_modified", 0.0)
-                )
-                
-                # Add to the manager
-                manager.soundfonts.append(sf)
-                manager.next_id += 1
-                manager._build_indices()
-                
-                return sf
+                return _register_soundfont(manager, auto_metadata, soundfont_path, rebuild_indices)
         else:
             # Non-interactive mode, add with automatic metadata
             # Also preserving all detected metadata
-            rel_path = manager._get_relative_path(soundfont_path)
-            
-            # Creating a complete object with all metadata
-            mapped_notes = auto_metadata.get("mapped_notes", {})
-            mapped_notes_obj = MappedNotes(
-                min_note=mapped_notes.get("min_note", "C0"),
-                max_note=mapped_notes.get("max_note", "C8"),
-                missing_notes=mapped_notes.get("missing_notes", [])
-            )
-            
-            sf = SoundfontMetadata(
-                id=manager.next_id,
-                name=auto_metadata.get("name", ""),
-                path=rel_path,
-                timbre=auto_metadata.get("timbre", ""),
-                tags=auto_metadata.get("tags", []),
-                instrument_type=auto_metadata.get("instrument_type", ""),
-                quality=auto_metadata.get("quality", "medium"),
-                genre=auto_metadata.get("genre", []),
-                mapped_notes=mapped_notes_obj,
-                polyphony=auto_metadata.get("polyphony", 32),
-                sample_rate=auto_metadata.get("sample_rate", 44100),
-                bit_depth=auto_metadata.get("bit_depth", 16),
-                size_mb=auto_metadata.get("size_mb", 0.0),
-                license=auto_metadata.get("license", ""),
-                author=auto_metadata.get("author", ""),
-                description=auto_metadata.get("description", ""),
-                hash=auto_metadata.get("hash", ""),
-                last_modified=auto_metadata.get("last_modified", 0.0)
-            )
-            
-            # Add to the manager
-            manager.soundfonts.append(sf)
-            manager.next_id += 1
-            manager._build_indices()
-            
-            return sf
+            return _register_soundfont(manager, auto_metadata, soundfont_path, rebuild_indices)
     
     except Exception as e:
-        print(Fore.RED + f"Error annotating {soundfont_path}: {e}" + Style.RESET_ALL)
+        print(_r(f"Error annotating {soundfont_path}: {e}"))
         if debug:
-            import traceback
-            print(Fore.RED + "Debug - Full traceback:" + Style.RESET_ALL)
+            print(_r("Debug - Full traceback:"))
             traceback.print_exc()
         return None
         
 
-def save_progress(manager: SoundfontManager, output_file: str, debug: bool = False) -> bool:
+def save_progress(manager: SoundfontManager, output_file: str, debug: bool = False,
+                  analysis_cache: Optional[Dict] = None, final: bool = False) -> bool:
     """
     Save the soundfont database with error handling.
     
@@ -748,106 +966,126 @@ def save_progress(manager: SoundfontManager, output_file: str, debug: bool = Fal
         manager: SoundfontManager instance
         output_file: Output JSON file path
         debug: If True, print more detailed error information
+        analysis_cache: Analysis cache to save alongside the database (optional)
+        final: If True, write the whole database; otherwise only append the
+               soundfonts added since the last save to the journal
         
     Returns:
         True if save was successful, False otherwise
     """
+    # Nothing changed since the last save: don't serialize the database again
+    if not (manager.dirty if final else manager.unsaved_count):
+        return True
+    
     try:
-        manager.save_soundfonts()
-        print(Fore.GREEN + f"Soundfonts saved successfully to {output_file}" + Style.RESET_ALL)
+        if final:
+            manager.save_soundfonts()
+        else:
+            manager.save_soundfonts_incremental()
+        if analysis_cache is not None:
+            _trim_analysis_cache(analysis_cache)
+            if not save_analysis_cache(analysis_cache, _analysis_cache_path(output_file)) and debug:
+                print(_y("Debug - Could not save the analysis cache"))
+        _info(f"Soundfonts saved successfully to {output_file}")
+        sys.stdout.flush()
         return True
     except Exception as e:
-        print(Fore.RED + f"Error saving database to {output_file}: {e}" + Style.RESET_ALL)
+        print(_r(f"Error saving database to {output_file}: {e}"))
         if debug:
-            import traceback
-            print(Fore.RED + "Debug - Full traceback:" + Style.RESET_ALL)
+            print(_r("Debug - Full traceback:"))
             traceback.print_exc()
         return False
 
-def simplified_midi_for_test(output_file: str) -> bool:
-    """Cria um arquivo MIDI simples com apenas três notas centrais para teste."""
-    try:
-        import pretty_midi
-        
-        midi = pretty_midi.PrettyMIDI()
-        instrument = pretty_midi.Instrument(program=0)  # Piano
-        
-        # Apenas três notas simples (C4, E4, G4) com velocidade mais baixa
-        notes = [
-            {"note": 60, "start": 0.0, "end": 0.5, "velocity": 80},  # C4
-            {"note": 64, "start": 0.5, "end": 1.0, "velocity": 80},  # E4
-            {"note": 67, "start": 1.0, "end": 2.0, "velocity": 80},  # G4
-        ]
-        
-        for note_info in notes:
-            note = pretty_midi.Note(
-                velocity=note_info["velocity"],
-                pitch=note_info["note"],
-                start=note_info["start"],
-                end=note_info["end"]
-            )
-            instrument.notes.append(note)
-        
-        midi.instruments.append(instrument)
-        midi.write(output_file)
-        
-        return os.path.exists(output_file)
-    except Exception as e:
-        print(f"Error creating simplified MIDI: {e}")
-        return False
+# Set by --fluidsynth-subprocess: render sound tests with the FluidSynth executable
+_USE_FLUIDSYNTH_SUBPROCESS = False
+
+# Sound test notes as (MIDI note, start, end) in seconds (see sound_test.SIMPLE_TEST_MIDI)
+TEST_NOTES = ((60, 0.0, 0.5), (64, 0.5, 1.0), (67, 1.0, 2.0))
+TEST_VELOCITY = 80
+# The sound test is only listened to once: render at half the usual sample rate
+TEST_SAMPLE_RATE = 22050
+FULL_QUALITY_SAMPLE_RATE = 44100
+
+@lru_cache(maxsize=1)
+def _test_midi_path() -> str:
+    """
+    Write the sound test MIDI file once per run.
+    
+    Returns:
+        Path of the MIDI file (in the session temporary directory)
+    """
+    from sound_test import SIMPLE_TEST_MIDI
+    
+    midi_path = os.path.join(_session_tmpdir(), "soundfont_test.mid")
+    with open(midi_path, "wb") as f:
+        f.write(SIMPLE_TEST_MIDI)
+    return midi_path
+
+@lru_cache(maxsize=1)
+def _pyfluidsynth_available() -> bool:
+    """Check if pyfluidsynth is installed, without importing it or creating a synth."""
+    return importlib.util.find_spec("fluidsynth") is not None
 
-def test_soundfont_simple(soundfont_path: str, wav_output: str, debug: bool = False) -> bool:
-    """Versão simplificada para testar soundfont e gerar WAV."""
+def test_soundfont_simple(soundfont_path: str, wav_output: str, debug: bool = False,
+                          full_quality: bool = False) -> bool:
+    """Versão simplificada para testar soundfont e gerar WAV (a 44.1 kHz só com full_quality)."""
+    sample_rate = FULL_QUALITY_SAMPLE_RATE if full_quality else TEST_SAMPLE_RATE
+    
     if not os.path.exists(soundfont_path):
         if debug:
             print(f"Error: Soundfont file not found: {soundfont_path}")
         return False
     
+    # Renderizar no próprio processo com pyfluidsynth, se disponível, usando o
+    # sintetizador em cache do fluidsynth_helper (o soundfont fica carregado)
+    if not _USE_FLUIDSYNTH_SUBPROCESS and _pyfluidsynth_available():
+        try:
+            from fluidsynth_helper import FluidSynthServer
+            
+            notes = [{"note": note, "start": start, "end": end, "velocity": TEST_VELOCITY}
+                     for note, start, end in TEST_NOTES]
+            server = FluidSynthServer(soundfont_path, gain=0.7, sample_rate=sample_rate)
+            # Half a second for the release of the last note
+            if server.render_notes(notes, wav_output, tail=0.5) and os.path.getsize(wav_output) > 0:
+                return True
+            if debug:
+                print("pyfluidsynth rendering produced no output, falling back to subprocess")
+        except Exception as e:
+            if debug:
+                print(f"pyfluidsynth rendering failed, falling back to subprocess: {e}")
+    
     # Verificar se o FluidSynth está disponível
-    fluidsynth_available = False
-    try:
-        result = subprocess.run(['fluidsynth', '--version'], 
-                               stdout=subprocess.PIPE, 
-                               stderr=subprocess.PIPE)
-        fluidsynth_available = (result.returncode == 0)
-    except:
+    if not check_fluidsynth_available():
         if debug:
             print("Error: FluidSynth not found.")
         return False
     
-    if not fluidsynth_available:
-        return False
-    
-    # Criar arquivo MIDI temporário
-    temp_midi = None
     try:
-        # Criar arquivo MIDI temporário
-        fd, temp_midi = tempfile.mkstemp(suffix=".mid")
-        os.close(fd)
-        
-        if not simplified_midi_for_test(temp_midi):
-            if debug:
-                print("Error creating MIDI file for test.")
-            return False
+        # Arquivo MIDI de teste, escrito uma vez por execução
+        test_midi = _test_midi_path()
         
         # Renderizar para WAV usando FluidSynth
         cmd = [
             'fluidsynth',
             '-ni',                # No shell interface
             '-g', '0.7',          # Gain (volume mais baixo)
+            '-r', str(sample_rate),  # Taxa de amostragem
             '-F', wav_output,     # Arquivo WAV de saída
             soundfont_path,       # Soundfont
-            temp_midi             # Arquivo MIDI
+            test_midi             # Arquivo MIDI
         ]
+        if not full_quality:
+            cmd[1:1] = ['-z', '1024']  # Buffers maiores: menos iterações na renderização
         
         if debug:
             print(f"Executing command: {' '.join(cmd)}")
         
+        # A saída do FluidSynth só é lida (stderr) no modo debug
         result = subprocess.run(
             cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE if debug else subprocess.DEVNULL,
+            text=debug
         )
         
         if result.returncode == 0 and os.path.exists(wav_output) and os.path.getsize(wav_output) > 0:
@@ -861,119 +1099,302 @@ def test_soundfont_simple(soundfont_path: str, wav_output: str, debug: bool = Fa
         if debug:
             print(f"Error during soundfont test: {e}")
         return False
+
+def _quiet_worker() -> None:
+    """Process pool initializer: keep background workers from printing over the prompts."""
+    global _QUIET
+    _QUIET = True
+    sys.stdout = open(os.devnull, "w")
+
+def _run_batch(soundfonts: List[str], manager: SoundfontManager, mode: AnalysisMode,
+               args: argparse.Namespace, analysis_cache: Dict,
+               quality_threshold: Optional[float] = None,
+               skip_annotated: bool = True) -> Tuple[int, int]:
+    """
+    Annotate a list of soundfonts, saving progress every --batch-size new soundfonts.
     
-    finally:
-        # Limpar arquivo MIDI temporário
-        if temp_midi and os.path.exists(temp_midi):
+    With skip_annotated, soundfonts already in the database are skipped unless
+    --force. With --jobs > 1 the analyses run in a process pool and the parent
+    process adds the results: in batch modes as they complete, in interactive
+    (or --insert-data) mode in order, asking the questions for each soundfont as
+    soon as its analysis is ready. Interactive workers run quiet.
+    
+    Args:
+        soundfonts: Paths to the .sf2 files
+        manager: SoundfontManager instance
+        mode: Analysis mode
+        args: Parsed command line arguments
+        analysis_cache: Cache of previous analysis results, updated in place
+        quality_threshold: Size-based quality threshold for the soundfonts added (batch modes)
+        skip_annotated: If True, skip soundfonts already in the database (unless --force)
+        
+    Returns:
+        Tuple (processed_count, success_count)
+    """
+    processed_count = 0
+    success_count = 0
+    interactive = bool(mode & AnalysisMode.INTERACTIVE) or args.insert_data
+    classified_idx = len(manager.soundfonts)
+    
+    def classify_quality() -> None:
+        # Size-based quality of the soundfonts added since the last call, in one pass
+        nonlocal classified_idx
+        added = manager.soundfonts[classified_idx:]
+        if quality_threshold is not None and added:
+            labels = size_quality_labels([sf.size_mb for sf in added], quality_threshold)
+            for sf, label in zip(added, labels.tolist()):
+                sf.quality = label
+        classified_idx = len(manager.soundfonts)
+    
+    def save_if_needed() -> None:
+        # Save progress periodically
+        if manager.unsaved_count >= args.batch_size:
+            classify_quality()
+            _info(f"Saving progress ({processed_count}/{len(soundfonts)})...", "yellow")
+            save_progress(manager, args.output, args.debug, analysis_cache)
+        # One write for all the lines printed for this soundfont
+        sys.stdout.flush()
+    
+    # Check if the soundfont is already annotated and we're not forcing reanalysis
+    to_annotate = []
+    for sf_path in soundfonts:
+        if skip_annotated and not args.force and manager.has_path(os.path.relpath(sf_path, args.directory)):
+            _info(f"Skipping {os.path.basename(sf_path)} (already annotated)", "yellow")
+            continue
+        to_annotate.append(sf_path)
+    
+    if args.jobs <= 1 or len(to_annotate) <= 1:
+        for sf_path in to_annotate:
             try:
-                os.remove(temp_midi)
-            except:
-                pass
+                result = annotate_soundfont(
+                    sf_path, manager, mode, args.play, args.insert_data, args.debug,
+                    args.no_timbre_analysis, args.quality_threshold, args.audio_driver,
+                    args.test_note_range, analysis_cache, args.force,
+                    not args.no_parallel_analysis, rebuild_indices=False
+                )
+                processed_count += 1
+                if result:
+                    success_count += 1
+                save_if_needed()
+            
+            except Exception as e:
+                print(_r(f"Unexpected error processing {sf_path}: {e}"))
+                if args.debug:
+                    print(_r("Debug - Full traceback:"))
+                    traceback.print_exc()
+        
+        classify_quality()
+        return processed_count, success_count
+    
+    # Unchanged files reuse their cached analysis instead of a worker
+    cache_keys = {
+        sf_path: _analysis_cache_key(sf_path, mode.value_str, args.insert_data, args.no_timbre_analysis,
+                                     args.quality_threshold, args.test_note_range)
+        for sf_path in to_annotate
+    }
+    # Interactive workers run in the background while the user answers prompts
+    executor = ProcessPoolExecutor(max_workers=args.jobs,
+                                   initializer=_quiet_worker if interactive else None)
+    try:
+        futures = {}
+        render_futures = {}
+        for sf_path in to_annotate:
+            if args.force or not cache_keys[sf_path] or cache_keys[sf_path] not in analysis_cache:
+                futures[sf_path] = executor.submit(
+                    _annotate_one, sf_path, mode.value, args.no_timbre_analysis,
+                    args.quality_threshold, args.test_note_range, args.debug,
+                    not args.no_parallel_analysis, args.insert_data
+                )
+            # Render the sound tests ahead while the user answers for earlier soundfonts
+            if interactive and args.play:
+                render_futures[sf_path] = executor.submit(
+                    test_soundfont_simple, sf_path, _test_wav_path(sf_path)
+                )
+        
+        if interactive:
+            for sf_path in to_annotate:
+                future = futures.get(sf_path)
+                if future is not None:
+                    try:
+                        auto_metadata = future.result()
+                        if cache_keys[sf_path]:
+                            analysis_cache[cache_keys[sf_path]] = auto_metadata
+                    except Exception as e:
+                        print(_r(f"Error annotating {sf_path}: {e}"))
+                
+                # Don't play a WAV that is still being written; a failed render
+                # is removed so that play_soundfont_test tries again
+                if sf_path in render_futures:
+                    try:
+                        rendered = render_futures[sf_path].result()
+                    except Exception:
+                        rendered = False
+                    if not rendered:
+                        try:
+                            os.unlink(_test_wav_path(sf_path))
+                        except OSError:
+                            pass
+                
+                # The analysis is in the cache now, so it is not forced again
+                result = annotate_soundfont(
+                    sf_path, manager, mode, args.play, args.insert_data, args.debug,
+                    args.no_timbre_analysis, args.quality_threshold, args.audio_driver,
+                    args.test_note_range, analysis_cache, False,
+                    not args.no_parallel_analysis, rebuild_indices=False
+                )
+                processed_count += 1
+                if result:
+                    success_count += 1
+                save_if_needed()
+        else:
+            for sf_path in to_annotate:
+                if sf_path not in futures:
+                    _register_soundfont(manager, _get_cached_analysis(analysis_cache, cache_keys[sf_path]),
+                                        sf_path, rebuild_indices=False)
+                    processed_count += 1
+                    success_count += 1
+                    _info(f"Annotated (cached): {sf_path}")
+            
+            paths_by_future = {future: sf_path for sf_path, future in futures.items()}
+            for future in as_completed(paths_by_future):
+                sf_path = paths_by_future[future]
+                processed_count += 1
+                try:
+                    auto_metadata = future.result()
+                    if cache_keys[sf_path]:
+                        analysis_cache[cache_keys[sf_path]] = auto_metadata
+                    _register_soundfont(manager, auto_metadata, sf_path, rebuild_indices=False)
+                    success_count += 1
+                    _info(f"Annotated: {sf_path}")
+                except Exception as e:
+                    print(_r(f"Error annotating {sf_path}: {e}"))
+                save_if_needed()
+    finally:
+        # Don't wait for queued analyses if the user interrupted the batch
+        executor.shutdown(wait=False, cancel_futures=True)
     
-    return False
+    classify_quality()
+    return processed_count, success_count
 
 def main() -> None:
-    print(Fore.YELLOW + "=== Soundfont Annotator ===" + Style.RESET_ALL)
+    global _QUIET, _USE_FLUIDSYNTH_SUBPROCESS
+    print(_y("=== Soundfont Annotator ==="))
     """Main program function."""
     parser = setup_argparse()
     args = parser.parse_args()
     
+    # Output is flushed at the end of each soundfont, after saves, before long
+    # renders and by input() before each prompt, instead of once per line on a terminal
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(line_buffering=False)
+    
+    if args.quiet:
+        _disable_colors()
+        _QUIET = True
+    _USE_FLUIDSYNTH_SUBPROCESS = args.fluidsynth_subprocess
+    
     # Check if there's a specific soundfont to test
     if args.test_sf:
         if not os.path.exists(args.test_sf):
-            print(Fore.RED + f"Error: Soundfont file not found: {args.test_sf}" + Style.RESET_ALL)
+            print(_r(f"Error: Soundfont file not found: {args.test_sf}"))
             sys.exit(1)
             
-        print(Fore.YELLOW + f"\n=== Testing soundfont: {args.test_sf} ===" + Style.RESET_ALL)
+        print(_y(f"\n=== Testing soundfont: {args.test_sf} ==="))
         
         # First test the note range
-        print(Fore.CYAN + "\nPerforming note range test..." + Style.RESET_ALL)
+        print(_c("\nPerforming note range test..."))
         try:
-            min_note, max_note, missing_notes = test_note_range(args.test_sf)
+            min_note, max_note, missing_notes = _test_note_range(args.test_sf)
             
-            print(Fore.GREEN + "\nNote range test results:" + Style.RESET_ALL)
-            print(Fore.CYAN + f"Min note: {min_note}" + Style.RESET_ALL)
-            print(Fore.CYAN + f"Max note: {max_note}" + Style.RESET_ALL)
+            print(_g("\nNote range test results:"))
+            print(_c(f"Min note: {min_note}"))
+            print(_c(f"Max note: {max_note}"))
             
             if missing_notes:
-                print(Fore.CYAN + f"Missing notes: {', '.join(missing_notes)}" + Style.RESET_ALL)
+                print(_c(f"Missing notes: {', '.join(missing_notes)}"))
             else:
-                print(Fore.CYAN + "No missing notes detected in range." + Style.RESET_ALL)
+                print(_c("No missing notes detected in range."))
                 
             # Also play a test sound if requested
             if args.play:
-                print(Fore.YELLOW + "\nPlaying test sound..." + Style.RESET_ALL)
+                print(_y("\nPlaying test sound..."))
                 play_soundfont_test(args.test_sf, args.audio_driver, args.debug)
         
         except Exception as e:
-            print(Fore.RED + f"Error during note range test: {e}" + Style.RESET_ALL)
+            print(_r(f"Error during note range test: {e}"))
             if args.debug:
-                import traceback
                 traceback.print_exc()
         
         # Exit after testing the specific soundfont
         return
     
     # Set up analysis mode
-    mode = AnalysisMode(args.mode)
+    mode = AnalysisMode.from_str(args.mode)
     
     # Check for FluidSynth if play option is enabled
     if args.play and not check_fluidsynth_available():
-        print(Fore.RED + "Error: FluidSynth is not available in your system path." + Style.RESET_ALL)
-        print(Fore.YELLOW + "Please install FluidSynth and make sure it's in your PATH to use the --play option." + Style.RESET_ALL)
-        print(Fore.YELLOW + "Continuing without audio playback..." + Style.RESET_ALL)
+        print(_r("Error: FluidSynth is not available in your system path."))
+        print(_y("Please install FluidSynth and make sure it's in your PATH to use the --play option."))
+        print(_y("Continuing without audio playback..."))
         args.play = False
     
     if args.play:
-        audio_available = check_audio_dependencies(args.debug)
+        audio_available = check_audio_dependencies(args.debug, args.install_audio)
         if not audio_available:
-            print(Fore.YELLOW + "Warning: No audio playback library found." + Style.RESET_ALL)
-            print(Fore.YELLOW + "For a better experience, install at least one of the following libraries:" + Style.RESET_ALL)
-            print(Fore.YELLOW + "  - pygame:     pip install pygame" + Style.RESET_ALL)
-            print(Fore.YELLOW + "  - playsound:  pip install playsound" + Style.RESET_ALL)
-            print(Fore.YELLOW + "  - simpleaudio: pip install simpleaudio" + Style.RESET_ALL)
-            print(Fore.YELLOW + "  - sounddevice: pip install sounddevice soundfile" + Style.RESET_ALL)
-            print(Fore.YELLOW + "Continuing without automatic audio playback..." + Style.RESET_ALL)
+            print(_y("Warning: No audio playback library found."))
+            print(_y("For a better experience, install at least one of the following libraries:"))
+            print(_y("  - pygame:     pip install pygame"))
+            print(_y("  - playsound:  pip install playsound"))
+            print(_y("  - simpleaudio: pip install simpleaudio"))
+            print(_y("  - sounddevice: pip install sounddevice soundfile"))
+            print(_y("Continuing without automatic audio playback..."))
             
     # Initialize soundfont manager
     try:
         manager = SoundfontManager(args.output, args.directory)
     except Exception as e:
-        print(Fore.RED + f"Error initializing the SoundfontManager: {e}" + Style.RESET_ALL)
+        print(_r(f"Error initializing the SoundfontManager: {e}"))
         sys.exit(1)
     
+    # Results of previous runs, keyed by file path, size and modification time
+    analysis_cache = load_analysis_cache(_analysis_cache_path(args.output))
+    
+    # In batch full analysis the size-based quality is assigned by _run_batch,
+    # for all the soundfonts it collected at once
+    batch_quality_threshold = None
+    if mode == AnalysisMode.FULL and not args.insert_data:
+        batch_quality_threshold = args.quality_threshold
+    
     if args.scan:
         # Automatic scanning mode
-        print(Fore.YELLOW + f"Scanning directory {args.directory} for soundfonts..." + Style.RESET_ALL)
+        print(_y(f"Scanning directory {args.directory} for soundfonts..."))
         try:
             added = manager.scan_directory(args.directory, args.recursive)
-            print(Fore.GREEN + f"Added {len(added)} soundfonts to the database." + Style.RESET_ALL)
+            print(_g(f"Added {len(added)} soundfonts to the database."))
         except Exception as e:
-            print(Fore.RED + f"Error scanning directory: {e}" + Style.RESET_ALL)
+            print(_r(f"Error scanning directory: {e}"))
             if args.debug:
-                import traceback
-                print(Fore.RED + "Debug - Full traceback:" + Style.RESET_ALL)
+                print(_r("Debug - Full traceback:"))
                 traceback.print_exc()
         return
     
     # List soundfonts in directory
     try:
-        soundfonts = list_soundfonts(args.directory, args.recursive)
+        soundfonts = list_soundfonts(args.directory, args.recursive, not args.no_dir_cache)
     except Exception as e:
-        print(Fore.RED + f"Error listing soundfonts: {e}" + Style.RESET_ALL)
+        print(_r(f"Error listing soundfonts: {e}"))
         if args.debug:
-            import traceback
-            print(Fore.RED + "Debug - Full traceback:" + Style.RESET_ALL)
+            print(_r("Debug - Full traceback:"))
             traceback.print_exc()
         sys.exit(1)
     
     if not soundfonts:
-        print(Fore.RED + "No soundfonts found in the directory." + Style.RESET_ALL)
+        print(_r("No soundfonts found in the directory."))
         return
     
-    print(Fore.YELLOW + f"\n=== {len(soundfonts)} Soundfonts Found ===" + Style.RESET_ALL)
-    for i, sf in enumerate(soundfonts):
-        print(Fore.CYAN + f"{i + 1}. {os.path.basename(sf)}" + Style.RESET_ALL)
+    print(_y(f"\n=== {len(soundfonts)} Soundfonts Found ==="))
+    sys.stdout.write("".join(_c(f"{i}. {os.path.basename(sf)}") + "\n"
+                             for i, sf in enumerate(soundfonts, 1)))
     
     # Count for batch saving
     processed_count = 0
@@ -983,31 +1404,23 @@ def main() -> None:
     if mode == AnalysisMode.INTERACTIVE:
         while True:
             try:
-                choice_input = input(Fore.YELLOW + "\nChoose a soundfont to annotate (0 to exit, 'all' to annotate all): " + Style.RESET_ALL)
+                choice_input = input(_y("\nChoose a soundfont to annotate (0 to exit, 'all' to annotate all): "))
                 
                 if choice_input.lower() in ['all', 'a']:
                     # Annotate all soundfonts
-                    for i, sf_path in enumerate(soundfonts):
-                        result = annotate_soundfont(
-                            sf_path, manager, mode, args.play, args.insert_data, args.debug,
-                            args.no_timbre_analysis, args.quality_threshold, args.audio_driver,
-                            args.test_note_range
-                        )
-                        processed_count += 1
-                        if result:
-                            success_count += 1
-                        
-                        # Save progress periodically
-                        if processed_count % args.batch_size == 0:
-                            print(Fore.YELLOW + f"Saving progress ({processed_count}/{len(soundfonts)})..." + Style.RESET_ALL)
-                            save_progress(manager, args.output, args.debug)
+                    batch_processed, batch_success = _run_batch(
+                        soundfonts, manager, mode, args, analysis_cache,
+                        batch_quality_threshold, skip_annotated=False
+                    )
+                    processed_count += batch_processed
+                    success_count += batch_success
                     break
                 
                 choice = int(choice_input)
                 if choice == 0:
                     break
                 if choice < 1 or choice > len(soundfonts):
-                    print(Fore.RED + "Invalid choice." + Style.RESET_ALL)
+                    print(_r("Invalid choice."))
                     continue
                 
                 # Annotate the selected soundfont
@@ -1015,91 +1428,66 @@ def main() -> None:
                 result = annotate_soundfont(
                     sf_path, manager, mode, args.play, args.insert_data, args.debug,
                     args.no_timbre_analysis, args.quality_threshold, args.audio_driver,
-                    args.test_note_range
+                    args.test_note_range, analysis_cache, args.force,
+                    not args.no_parallel_analysis, rebuild_indices=False
                 )
                 if result:
                     success_count += 1
                 processed_count += 1
                 
                 # Save after each annotation in interactive mode
-                save_progress(manager, args.output, args.debug)
+                save_progress(manager, args.output, args.debug, analysis_cache)
             
             except ValueError:
-                print(Fore.RED + "Invalid input. Enter a number or 'all'." + Style.RESET_ALL)
+                print(_r("Invalid input. Enter a number or 'all'."))
             except KeyboardInterrupt:
-                print(Fore.YELLOW + "\nOperation cancelled by user." + Style.RESET_ALL)
+                print(_y("\nOperation cancelled by user."))
                 break
     else:
         # In non-interactive modes, annotate all soundfonts
-        for i, sf_path in enumerate(soundfonts):
-            # Check if the soundfont is already annotated and we're not forcing reanalysis
-            try:
-                rel_path = os.path.relpath(sf_path, args.directory)
-                existing = any(sf.path == rel_path for sf in manager.get_all_soundfonts())
-                
-                if existing and not args.force:
-                    print(Fore.YELLOW + f"Skipping {os.path.basename(sf_path)} (already annotated)" + Style.RESET_ALL)
-                    continue
-                
-                result = annotate_soundfont(
-                    sf_path, manager, mode, args.play, args.insert_data, args.debug,
-                    args.no_timbre_analysis, args.quality_threshold, args.audio_driver,
-                    args.test_note_range
-                )
-                processed_count += 1
-                if result:
-                    success_count += 1
-                
-                # Save progress periodically
-                if processed_count % args.batch_size == 0:
-                    print(Fore.YELLOW + f"Saving progress ({processed_count}/{len(soundfonts)})..." + Style.RESET_ALL)
-                    save_progress(manager, args.output, args.debug)
-            
-            except Exception as e:
-                print(Fore.RED + f"Unexpected error processing {sf_path}: {e}" + Style.RESET_ALL)
-                if args.debug:
-                    import traceback
-                    print(Fore.RED + "Debug - Full traceback:" + Style.RESET_ALL)
-                    traceback.print_exc()
+        processed_count, success_count = _run_batch(
+            soundfonts, manager, mode, args, analysis_cache,
+            batch_quality_threshold
+        )
     
-    # Final save
+    # Final save (indices are rebuilt once for the whole batch)
     if processed_count > 0:
-        save_success = save_progress(manager, args.output, args.debug)
+        manager._build_indices()
+        save_success = save_progress(manager, args.output, args.debug, analysis_cache, final=True)
         if save_success:
-            print(Fore.GREEN + f"\nMetadata saved to {args.output}" + Style.RESET_ALL)
-            print(Fore.GREEN + f"Successfully processed {success_count} out of {processed_count} soundfonts." + Style.RESET_ALL)
+            print(_g(f"\nMetadata saved to {args.output}"))
+            print(_g(f"Successfully processed {success_count} out of {processed_count} soundfonts."))
         else:
-            print(Fore.RED + f"\nFailed to save metadata to {args.output}" + Style.RESET_ALL)
+            print(_r(f"\nFailed to save metadata to {args.output}"))
     
     # Show statistics
     try:
         stats = manager.get_statistics()
-        print(Fore.YELLOW + f"\n=== Soundfont Collection Statistics ===" + Style.RESET_ALL)
-        print(Fore.CYAN + f"Total Soundfonts: " + Style.RESET_ALL + f"{stats['total_soundfonts']}")
-        print(Fore.CYAN + f"Total Size: " + Style.RESET_ALL + f"{stats['total_size_mb']:.2f} MB")
-        print(Fore.CYAN + f"Average Size: " + Style.RESET_ALL + f"{stats['avg_size_mb']:.2f} MB")
+        print(_y(f"\n=== Soundfont Collection Statistics ==="))
+        print(_c(f"Total Soundfonts: ") + f"{stats['total_soundfonts']}")
+        print(_c(f"Total Size: ") + f"{stats['total_size_mb']:.2f} MB")
+        print(_c(f"Average Size: ") + f"{stats['avg_size_mb']:.2f} MB")
         
         # Show top instrument types
-        print(Fore.CYAN + "Top Instrument Types: " + Style.RESET_ALL)
-        for i, (instrument_type, count) in enumerate(list(stats['instrument_types'].items())[:5]):
+        print(_c("Top Instrument Types: "))
+        for instrument_type, count in islice(stats['instrument_types'].items(), 5):
             print(f"  {instrument_type}: {count}")
         
         # Show quality distribution
-        print(Fore.CYAN + "Quality Distribution: " + Style.RESET_ALL)
+        print(_c("Quality Distribution: "))
         for quality, count in stats['quality_distribution'].items():
             print(f"  {quality}: {count}")
     except Exception as e:
-        print(Fore.RED + f"Error generating statistics: {e}" + Style.RESET_ALL)
+        print(_r(f"Error generating statistics: {e}"))
 
 
 if __name__ == "__main__":
     try:
         main()
     except KeyboardInterrupt:
-        print(Fore.YELLOW + "\nProgram interrupted by user." + Style.RESET_ALL)
+        print(_y("\nProgram interrupted by user."))
         sys.exit(0)
     except Exception as e:
-        print(Fore.RED + f"Unhandled error: {e}" + Style.RESET_ALL)
-        import traceback
+        print(_r(f"Unhandled error: {e}"))
         traceback.print_exc()
         sys.exit(1)
@@ -1,13 +1,18 @@
 import os
+import atexit
 import tempfile
 import subprocess
 import platform
+from functools import lru_cache
 from typing import Optional, Tuple, List
 
+@lru_cache(maxsize=1)
 def test_audio_drivers() -> List[str]:
     """
     Testa quais drivers de áudio estão realmente funcionando no sistema.
     
+    O resultado não muda durante a execução, então os testes rodam uma única vez.
+    
     Returns:
         Lista de drivers de áudio testados e funcionais
     """
@@ -55,6 +60,30 @@ def test_audio_drivers() -> List[str]:
     
     return working_drivers
 
+@lru_cache(maxsize=None)
+def _fluidsynth_available(fluidsynth_cmd: str) -> bool:
+    """Verifica (uma vez por executável) se o FluidSynth responde a --version."""
+    try:
+        result = subprocess.run([fluidsynth_cmd, '--version'],
+                                stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL)
+        return result.returncode == 0
+    except OSError:
+        return False
+
+# Arquivo MIDI de teste pronto (C4, E4, G4 com velocidade 80), para não
+# precisar do pretty_midi a cada teste
+SIMPLE_TEST_MIDI = bytes.fromhex(
+    "4d546864 00000006 0000 0001 00dc"  # MThd: formato 0, 1 trilha, 220 ticks por batida
+    "4d54726b 00000029"                 # MTrk, 41 bytes
+    "00 ff5103 07a120"                  # Andamento: 120 BPM
+    "00 c000"                           # Programa 0 (piano)
+    "00 903c50 815c 803c00"             # C4, 0.0-0.5 s
+    "00 904050 815c 804000"             # E4, 0.5-1.0 s
+    "00 904350 8338 804300"             # G4, 1.0-2.0 s
+    "00 ff2f00"                         # Fim da trilha
+)
+
 def simplified_midi_for_test(output_file: str) -> bool:
     """
     Cria um arquivo MIDI simples com apenas três notas centrais para teste.
@@ -66,40 +95,38 @@ def simplified_midi_for_test(output_file: str) -> bool:
         True se criado com sucesso, False caso contrário
     """
     try:
-        import pretty_midi
-        
-        midi = pretty_midi.PrettyMIDI()
-        instrument = pretty_midi.Instrument(program=0)  # Piano
-        
-        # Apenas três notas simples (C4, E4, G4) com velocidade mais baixa
-        notes = [
-            {"note": 60, "start": 0.0, "end": 0.5, "velocity": 80},  # C4
-            {"note": 64, "start": 0.5, "end": 1.0, "velocity": 80},  # E4
-            {"note": 67, "start": 1.0, "end": 2.0, "velocity": 80},  # G4
-        ]
-        
-        # Adicionar notas ao instrumento
-        for note_info in notes:
-            note = pretty_midi.Note(
-                velocity=note_info["velocity"],
-                pitch=note_info["note"],
-                start=note_info["start"],
-                end=note_info["end"]
-            )
-            instrument.notes.append(note)
-        
-        # Adicionar o instrumento ao MIDI
-        midi.instruments.append(instrument)
-        
-        # Salvar o arquivo MIDI
-        midi.write(output_file)
-        
-        return os.path.exists(output_file)
-    except Exception as e:
+        with open(output_file, "wb") as f:
+            f.write(SIMPLE_TEST_MIDI)
+        return True
+    except OSError as e:
         print(f"Error while creating a simplified MIDI: {e}")
         return False
 
-def test_soundfont(soundfont_path: str, verbose: bool = False, wav_output: Optional[str] = None) -> Tuple[bool, Optional[str]]:
+@lru_cache(maxsize=1)
+def get_shared_test_midi() -> Optional[str]:
+    """
+    Cria o arquivo MIDI de teste uma única vez e o reutiliza em todos os testes.
+    
+    Returns:
+        Caminho do arquivo MIDI (removido ao final da execução) ou None em caso de erro
+    """
+    fd, midi_file = tempfile.mkstemp(suffix=".mid")
+    os.close(fd)
+    atexit.register(_remove_quietly, midi_file)
+    
+    if not simplified_midi_for_test(midi_file):
+        return None
+    return midi_file
+
+def _remove_quietly(path: str) -> None:
+    """Remove um arquivo, ignorando se ele não existir mais."""
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+def test_soundfont(soundfont_path: str, verbose: bool = False, wav_output: Optional[str] = None,
+                   fluidsynth_path: Optional[str] = None) -> Tuple[bool, Optional[str]]:
     """
     Testa um soundfont tentando várias abordagens, incluindo renderização para WAV.
     
@@ -107,6 +134,7 @@ def test_soundfont(soundfont_path: str, verbose: bool = False, wav_output: Optio
         soundfont_path: Caminho para o arquivo .sf2
         verbose: Se True, exibe saídas detalhadas
         wav_output: Caminho para salvar o WAV gerado (opcional)
+        fluidsynth_path: Caminho do executável do FluidSynth (opcional, usa 'fluidsynth' do PATH)
         
     Returns:
         Tupla (sucesso, caminho_wav) onde caminho_wav é o WAV gerado (se houver)
@@ -116,31 +144,15 @@ def test_soundfont(soundfont_path: str, verbose: bool = False, wav_output: Optio
             print(f"Error: Soundfont file not found: {soundfont_path}")
         return False, None
     
-    # Verificar se o FluidSynth está disponível
-    fluidsynth_available = False
-    try:
-        result = subprocess.run(['fluidsynth', '--version'], 
-                               stdout=subprocess.PIPE, 
-                               stderr=subprocess.PIPE)
-        fluidsynth_available = (result.returncode == 0)
-    except:
-        if verbose:
-            print("Error: FluidSynth not available.")
-        return False, None
-    
-    if not fluidsynth_available:
-        return False, None
+    fluidsynth_cmd = fluidsynth_path or 'fluidsynth'
     
-    # Criar arquivo MIDI simplificado
+    # Arquivos temporários a remover ao final
     temp_files = []
     
     try:
-        # Criar arquivo MIDI temporário
-        fd, midi_file = tempfile.mkstemp(suffix=".mid")
-        os.close(fd)
-        temp_files.append(midi_file)
-        
-        if not simplified_midi_for_test(midi_file):
+        # Arquivo MIDI de teste, criado uma vez por execução
+        midi_file = get_shared_test_midi()
+        if midi_file is None:
             if verbose:
                 print("Error while creating a MIDI file for testing.")
             return False, None
@@ -158,27 +170,40 @@ def test_soundfont(soundfont_path: str, verbose: bool = False, wav_output: Optio
         if verbose:
             print(f"Rendering WAV test file using {soundfont_path}...")
         
-        # Obter drivers de áudio funcionais
-        working_drivers = test_audio_drivers()
-        
-        # Tentar cada driver para renderizar WAV
+        # Primeiro no sintetizador em cache do fluidsynth_helper (pyfluidsynth),
+        # sem iniciar o FluidSynth; o soundfont continua carregado para os
+        # próximos testes com ele
         success = False
+        from fluidsynth_helper import FluidSynthServer
+        try:
+            success = (FluidSynthServer(soundfont_path, gain=0.7).render(midi_file, temp_wav)
+                       and os.path.getsize(temp_wav) > 0)
+        except Exception as e:
+            # RuntimeError sem pyfluidsynth
+            if verbose:
+                print(f"In-process rendering failed, falling back to FluidSynth: {e}")
+        
+        # Verificar se o FluidSynth está disponível
+        if not success and not _fluidsynth_available(fluidsynth_cmd):
+            if verbose:
+                print("Error: FluidSynth not available.")
+            return False, None
         
-        for driver in working_drivers:
+        # Renderizar com o executável: a saída vai para arquivo, então não é
+        # preciso testar drivers de áudio (o driver 'file' basta)
+        if not success:
             cmd = [
-                'fluidsynth',
+                fluidsynth_cmd,
                 '-ni',                # No shell interface
                 '-g', '0.7',          # Gain (volume mais baixo para evitar clipping)
+                '-a', 'file',         # Sem driver de áudio real
+                '-z', '512',          # Tamanho do período
                 '-F', temp_wav,       # Arquivo WAV de saída
-                '-a', driver,         # Driver de áudio
                 soundfont_path,       # Soundfont
                 midi_file             # Arquivo MIDI
             ]
             
             try:
-                if verbose:
-                    print(f"Trying with driver: {driver}")
-                
                 result = subprocess.run(
                     cmd,
                     stdout=subprocess.PIPE,
@@ -189,14 +214,12 @@ def test_soundfont(soundfont_path: str, verbose: bool = False, wav_output: Optio
                 
                 if result.returncode == 0 and os.path.exists(temp_wav) and os.path.getsize(temp_wav) > 0:
                     success = True
-                    break
                 elif verbose:
-                    print(f"Error with driver {driver}: {result.stderr}")
+                    print(f"Error while rendering: {result.stderr}")
             
             except subprocess.TimeoutExpired:
                 if verbose:
-                    print(f"Timeout while rendering with driver {driver}")
-                # Continuar com o próximo driver
+                    print("Timeout while rendering")
             except Exception as e:
                 if verbose:
                     print(f"Error while rendering: {e}")
@@ -235,9 +258,8 @@ def test_soundfont(soundfont_path: str, verbose: bool = False, wav_output: Optio
         # Limpar arquivos temporários
         for temp_file in temp_files:
             try:
-                if os.path.exists(temp_file):
-                    os.remove(temp_file)
-            except:
+                os.unlink(temp_file)
+            except OSError:
                 pass
     
     return False, None
@@ -263,6 +285,28 @@ def play_wav_simple(wav_file: str, debug: bool = False) -> bool:
             print(f"Error while playing with pygame: {e}")
         return False
 
+def play_wav_buffer(wav_data: bytes, debug: bool = False) -> bool:
+    """Tenta reproduzir dados WAV em memória usando pygame, sem arquivo em disco."""
+    if not wav_data:
+        if debug:
+            print("Empty WAV buffer")
+        return False
+    
+    try:
+        import io
+        import pygame
+        pygame.mixer.init()
+        pygame.mixer.music.load(io.BytesIO(wav_data))
+        pygame.mixer.music.play()
+        import time
+        time.sleep(2)  # Reproduzir por 2 segundos pelo menos
+        pygame.mixer.music.fadeout(500)
+        return True
+    except Exception as e:
+        if debug:
+            print(f"Error while playing buffer with pygame: {e}")
+        return False
+
 def create_single_note_midi(output_file: str, note: int) -> bool:
     """Create a simple MIDI file with a single note."""
     try:
@@ -1,13 +1,10 @@
 import os
 import json
 import random
-import shlex
 from typing import List, Dict, Optional, Union, Callable, Any, Set, Tuple
 from dataclasses import asdict
-import pretty_midi
 from functools import lru_cache
-from collections import defaultdict
-import numpy as np
+from collections import Counter, defaultdict
 
 # Importa o módulo de utilidades
 from soundfont_utils import (
@@ -15,13 +12,34 @@ from soundfont_utils import (
     MappedNotes, 
     extract_sf2_metadata,
     analyze_timbre,
-    generate_tag_suggestions,
-    suggest_genres,
-    suggest_quality,
+    analyze_soundfont_full,
     create_test_midi,
+    SF2_SUFFIXES,
 )
 
-from fluidsynth_helper import run_fluidsynth
+from fluidsynth_helper import play_soundfont as fluidsynth_play
+
+# orjson is optional: when available, the database is encoded and decoded faster
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+@lru_cache(maxsize=4096)
+def _relative_path(sf2_path: str, abs_base: str) -> str:
+    """
+    Path of sf2_path relative to abs_base, or sf2_path (absolute) if outside it.
+    
+    Memoized: batches resolve the same paths against the same base many times.
+    sf2_path must already be absolute, so that the cached result doesn't depend
+    on the working directory.
+    """
+    sf2_path = os.path.normpath(sf2_path)
+    
+    # Check if path is within base directory
+    if sf2_path.startswith(abs_base):
+        return os.path.relpath(sf2_path, abs_base)
+    return sf2_path
 
 class SoundfontManager:
     """
@@ -40,10 +58,17 @@ class SoundfontManager:
         """
         self.json_path = json_path
         self.sf2_directory = sf2_directory
+        # Normalized absolute base directory, resolved once for _get_relative_path
+        self._abs_base = os.path.normpath(os.path.abspath(sf2_directory)) if sf2_directory else None
         self.soundfonts = []
         self.next_id = 1
+        # Soundfonts before this position are already on disk (JSON or journal)
+        self._last_saved_idx = 0
+        # True when the in-memory database differs from the JSON file
+        self.dirty = False
         self.indices = {
             "id": {},
+            "path": {},
             "name": defaultdict(list),
             "tags": defaultdict(list),
             "instrument_type": defaultdict(list),
@@ -59,63 +84,67 @@ class SoundfontManager:
         # Load soundfonts
         self.load_soundfonts()
     
+    def _journal_path(self) -> str:
+        """Path of the JSONL journal with soundfonts saved incrementally."""
+        return os.path.splitext(self.json_path)[0] + ".jsonl"
+    
     def load_soundfonts(self) -> None:
         """
-        Load soundfonts from the JSON file and build indices.
+        Load soundfonts from the JSON file (plus any incremental journal) and build indices.
         """
-        if os.path.exists(self.json_path):
+        journal_path = self._journal_path()
+        if os.path.exists(self.json_path) or os.path.exists(journal_path):
             try:
-                with open(self.json_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    
-                # Convert to SoundfontMetadata objects
-                self.soundfonts = []
-                for item in data:
-                    # Check for mapped_notes information
-                    mapped_notes = item.get("mapped_notes", {})
-                    if mapped_notes:
-                        mapped_notes_obj = MappedNotes(
-                            min_note=mapped_notes.get("min_note", "C0"),
-                            max_note=mapped_notes.get("max_note", "C8"),
-                            missing_notes=mapped_notes.get("missing_notes", [])
-                        )
+                data = []
+                if os.path.exists(self.json_path):
+                    if orjson is not None:
+                        with open(self.json_path, 'rb') as f:
+                            data = orjson.loads(f.read())
                     else:
-                        mapped_notes_obj = MappedNotes()
-                    
-                    # Create SoundfontMetadata object
-                    sf = SoundfontMetadata(
-                        id=item.get("id", 0),
-                        name=item.get("name", ""),
-                        path=item.get("path", ""),
-                        timbre=item.get("timbre", ""),
-                        tags=item.get("tags", []),
-                        instrument_type=item.get("instrument_type", ""),
-                        quality=item.get("quality", "medium"),
-                        genre=item.get("genre", []),
-                        mapped_notes=mapped_notes_obj,
-                        polyphony=item.get("polyphony", 0),
-                        sample_rate=item.get("sample_rate", 44100),
-                        bit_depth=item.get("bit_depth", 16),
-                        size_mb=item.get("size_mb", 0.0),
-                        license=item.get("license", ""),
-                        author=item.get("author", ""),
-                        description=item.get("description", ""),
-                        hash=item.get("hash", ""),
-                        last_modified=item.get("last_modified", 0.0)
-                    )
-                    
-                    self.soundfonts.append(sf)
-                    
-                    # Update next available ID
-                    if sf.id >= self.next_id:
-                        self.next_id = sf.id + 1
-                
-                # Build indices for quick search
-                self._build_indices()
-                
+                        with open(self.json_path, 'r', encoding='utf-8') as f:
+                            data = json.load(f)
             except Exception as e:
                 print(f"Error loading JSON file: {e}")
                 self.soundfonts = []
+                return
+            
+            # Soundfonts saved incrementally after the last full save. Records are
+            # parsed one by one: a run that crashed while appending leaves a
+            # truncated last line, which must not cost the rest of the database.
+            if os.path.exists(journal_path):
+                try:
+                    with open(journal_path, 'rb') as f:
+                        for line_number, line in enumerate(f, 1):
+                            if not line.strip():
+                                continue
+                            try:
+                                data.append(json.loads(line))
+                            except ValueError as e:
+                                print(f"Warning: Skipping malformed record in {journal_path} "
+                                      f"(line {line_number}): {e}")
+                except OSError as e:
+                    print(f"Warning: Error reading journal {journal_path}: {e}")
+            
+            # Convert to SoundfontMetadata objects
+            self.soundfonts = []
+            for item in data:
+                try:
+                    sf = SoundfontMetadata.from_dict(item)
+                except Exception as e:
+                    print(f"Warning: Skipping invalid soundfont record: {e}")
+                    continue
+                
+                self.soundfonts.append(sf)
+                
+                # Update next available ID
+                if sf.id >= self.next_id:
+                    self.next_id = sf.id + 1
+            
+            # Build indices for quick search
+            self._build_indices()
+            self._last_saved_idx = len(self.soundfonts)
+            # A journal still has to be folded into the JSON file
+            self.dirty = os.path.exists(journal_path)
         else:
             print(f"JSON file not found: {self.json_path}. Starting with empty database.")
             self.soundfonts = []
@@ -127,6 +156,7 @@ class SoundfontManager:
         # Clear indices
         self.indices = {
             "id": {},
+            "path": {},
             "name": defaultdict(list),
             "tags": defaultdict(list),
             "instrument_type": defaultdict(list),
@@ -141,8 +171,9 @@ class SoundfontManager:
         
         # Populate indices
         for sf in self.soundfonts:
-            # Index by ID
+            # Index by ID and path
             self.indices["id"][sf.id] = sf
+            self.indices["path"][sf.path] = sf
             
             # Index by name (keywords)
             if sf.name:
@@ -192,6 +223,8 @@ class SoundfontManager:
     def save_soundfonts(self) -> None:
         """
         Save soundfonts to the JSON file.
+        
+        The incremental journal, if any, is folded into the JSON file and removed.
         """
         try:
             # Convert objects to dictionaries
@@ -200,9 +233,63 @@ class SoundfontManager:
             # Ensure directory exists
             os.makedirs(os.path.dirname(os.path.abspath(self.json_path)), exist_ok=True)
             
-            # Save to JSON file with prettier formatting
-            with open(self.json_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4, ensure_ascii=False)
+            # Save to JSON file with prettier formatting (UTF-8 text unescaped);
+            # orjson only indents by 2 spaces, the json module keeps 4
+            if orjson is not None:
+                with open(self.json_path, 'wb') as f:
+                    f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            else:
+                with open(self.json_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=4, ensure_ascii=False)
+            
+            self._last_saved_idx = len(self.soundfonts)
+            self.dirty = False
+            try:
+                os.unlink(self._journal_path())
+            except FileNotFoundError:
+                pass
+        
+        except Exception as e:
+            print(f"Error saving soundfonts: {e}")
+            raise
+    
+    @property
+    def unsaved_count(self) -> int:
+        """Number of soundfonts added since the last save (full or incremental)."""
+        return len(self.soundfonts) - self._last_saved_idx
+    
+    def save_soundfonts_incremental(self) -> int:
+        """
+        Append the soundfonts added since the last save to the JSONL journal.
+        
+        Only new records are written, so periodic saves during a long run do not
+        rewrite the whole database. The journal is read back by load_soundfonts()
+        and folded into the JSON file by the next save_soundfonts().
+        
+        Returns:
+            Number of soundfonts written
+        """
+        new_soundfonts = self.soundfonts[self._last_saved_idx:]
+        if not new_soundfonts:
+            return 0
+        
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.json_path)), exist_ok=True)
+            
+            with open(self._journal_path(), 'a+b') as f:
+                # Start on a new line if a crashed run left a truncated record
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+                if orjson is not None:
+                    f.write(b"".join(orjson.dumps(sf.to_dict()) + b"\n" for sf in new_soundfonts))
+                else:
+                    f.write("".join(json.dumps(sf.to_dict(), ensure_ascii=False) + "\n"
+                                    for sf in new_soundfonts).encode('utf-8'))
+            
+            self._last_saved_idx = len(self.soundfonts)
+            return len(new_soundfonts)
         
         except Exception as e:
             print(f"Error saving soundfonts: {e}")
@@ -226,48 +313,21 @@ class SoundfontManager:
         
         # Check if soundfont already exists by path
         rel_path = self._get_relative_path(sf2_path)
-        for sf in self.soundfonts:
-            if sf.path == rel_path:
-                print(f"Soundfont already exists: {rel_path}")
-                return sf
+        existing = self.indices["path"].get(rel_path)
+        if existing:
+            print(f"Soundfont already exists: {rel_path}")
+            return existing
         
         # Extract technical metadata automatically
         metadata = {}
         if auto_analyze:
             try:
-                # Extract metadata from SF2 file
-                metadata = extract_sf2_metadata(sf2_path)
-                
-                # Analyze timbre
-                timbre_info = analyze_timbre(sf2_path)
-                metadata["timbre"] = timbre_info
-                
-                # Suggest tags
-                if "tags" not in metadata or not metadata["tags"]:
-                    metadata["tags"] = generate_tag_suggestions(metadata)
-                
-                # Suggest genres
-                if "genre" not in metadata or not metadata["genre"]:
-                    metadata["genre"] = suggest_genres(timbre_info)
-                
-                # Suggest quality
-                if "quality" not in metadata or not metadata["quality"]:
-                    metadata["quality"] = suggest_quality(metadata)
+                # Metadata, timbre and suggested tags, genres and quality
+                metadata = analyze_soundfont_full(sf2_path)
             
             except Exception as e:
                 print(f"Error in automatic analysis: {e}")
         
-        # Create SoundfontMetadata object
-        mapped_notes = metadata.get("mapped_notes", {})
-        if mapped_notes:
-            mapped_notes_obj = MappedNotes(
-                min_note=mapped_notes.get("min_note", "C0"),
-                max_note=mapped_notes.get("max_note", "C8"),
-                missing_notes=mapped_notes.get("missing_notes", [])
-            )
-        else:
-            mapped_notes_obj = MappedNotes()
-        
         # Check for size explicitly
         if "size_mb" not in metadata or metadata["size_mb"] <= 0:
             try:
@@ -277,30 +337,18 @@ class SoundfontManager:
                 metadata["size_mb"] = 0.0
         
         # Crie objeto SoundfontMetadata preservando todos os metadados
-        sf = SoundfontMetadata(
-            id=self.next_id,
-            name=metadata.get("name", os.path.basename(sf2_path).replace('.sf2', '')),
-            path=rel_path,
-            timbre=metadata.get("timbre", ""),
-            tags=metadata.get("tags", []),
-            instrument_type=metadata.get("instrument_type", ""),
-            quality=metadata.get("quality", "medium"),
-            genre=metadata.get("genre", []),
-            mapped_notes=mapped_notes_obj,
-            polyphony=metadata.get("polyphony", 32),
-            sample_rate=metadata.get("sample_rate", 44100),
-            bit_depth=metadata.get("bit_depth", 16),
-            size_mb=metadata.get("size_mb", 0.0),
-            license=metadata.get("license", ""),
-            author=metadata.get("author", ""),
-            description=metadata.get("description", ""),
-            hash=metadata.get("hash", ""),
-            last_modified=metadata.get("last_modified", 0.0)
-        )
+        sf = SoundfontMetadata.from_dict({
+            "name": os.path.basename(sf2_path).replace('.sf2', ''),
+            "polyphony": 32,
+            **metadata,
+            "id": self.next_id,
+            "path": rel_path
+        })
         
         # Add to database
         self.soundfonts.append(sf)
         self.next_id += 1
+        self.dirty = True
         
         # Update indices
         self._build_indices()
@@ -311,6 +359,26 @@ class SoundfontManager:
         
         return sf
     
+    def add_soundfont_deferred(self, sf: SoundfontMetadata) -> SoundfontMetadata:
+        """
+        Add an already analyzed soundfont without rebuilding the indices.
+        
+        Meant for batches: call _build_indices() once after the last soundfont.
+        Only the ID and path indices are kept up to date in the meantime.
+        
+        Args:
+            sf: SoundfontMetadata object (its id should be next_id)
+            
+        Returns:
+            The added SoundfontMetadata object
+        """
+        self.soundfonts.append(sf)
+        self.indices["id"][sf.id] = sf
+        self.indices["path"][sf.path] = sf
+        self.next_id += 1
+        self.dirty = True
+        return sf
+    
     def _get_relative_path(self, sf2_path: str) -> str:
         """
         Convert an absolute path to a path relative to the base directory.
@@ -321,18 +389,10 @@ class SoundfontManager:
         Returns:
             Path relative to the base directory
         """
-        if not self.sf2_directory:
+        if not self._abs_base:
             return sf2_path
         
-        # Normalize paths
-        sf2_path = os.path.normpath(os.path.abspath(sf2_path))
-        base_dir = os.path.normpath(os.path.abspath(self.sf2_directory))
-        
-        # Check if path is within base directory
-        if sf2_path.startswith(base_dir):
-            return os.path.relpath(sf2_path, base_dir)
-        else:
-            return sf2_path
+        return _relative_path(os.path.abspath(sf2_path), self._abs_base)
     
     def get_absolute_path(self, sf: Union[SoundfontMetadata, str, int]) -> str:
         """
@@ -384,6 +444,7 @@ class SoundfontManager:
         for key, value in kwargs.items():
             if hasattr(sf, key):
                 setattr(sf, key, value)
+        self.dirty = True
         
         # Update indices
         self._build_indices()
@@ -408,8 +469,13 @@ class SoundfontManager:
             print(f"Soundfont not found with ID: {sf_id}")
             return False
         
-        # Remove the soundfont
-        self.soundfonts = [s for s in self.soundfonts if s.id != sf_id]
+        # Remove the soundfont; _last_saved_idx is a list position, so it moves
+        # back if a soundfont already on disk is removed
+        index = self.soundfonts.index(sf)
+        del self.soundfonts[index]
+        if index < self._last_saved_idx:
+            self._last_saved_idx -= 1
+        self.dirty = True
         
         # Update indices
         self._build_indices()
@@ -431,6 +497,30 @@ class SoundfontManager:
         """
         return self.indices["id"].get(sf_id)
     
+    def get_soundfont_by_path(self, rel_path: str) -> Optional[SoundfontMetadata]:
+        """
+        Get a soundfont by its path in the database.
+        
+        Args:
+            rel_path: Path relative to the base directory (as stored in the database)
+            
+        Returns:
+            SoundfontMetadata object or None if not found
+        """
+        return self.indices["path"].get(rel_path)
+    
+    def has_path(self, rel_path: str) -> bool:
+        """
+        Check if a soundfont with the given path is in the database.
+        
+        Args:
+            rel_path: Path relative to the base directory (as stored in the database)
+            
+        Returns:
+            True if the path is in the database, False otherwise
+        """
+        return rel_path in self.indices["path"]
+    
     def get_all_soundfonts(self) -> List[SoundfontMetadata]:
         """
         Get all soundfonts.
@@ -785,7 +875,7 @@ class SoundfontManager:
         def scan_dir(dir_path):
             try:
                 for entry in os.scandir(dir_path):
-                    if entry.is_file() and entry.name.lower().endswith('.sf2'):
+                    if entry.name.endswith(SF2_SUFFIXES) and entry.is_file():
                         try:
                             sf = self.add_soundfont(entry.path, auto_analyze=True, save=False)
                             added_soundfonts.append(sf)
@@ -815,50 +905,24 @@ class SoundfontManager:
         Returns:
             Dictionary with statistics
         """
-        stats = {
-            "total_soundfonts": len(self.soundfonts),
-            "instrument_types": {},
-            "quality_distribution": {},
-            "genres": {},
-            "tags": {},
-            "authors": {},
-            "avg_size_mb": 0.0,
-            "total_size_mb": 0.0
-        }
+        instrument_types = Counter()
+        quality_distribution = Counter()
+        genres = Counter()
+        tags = Counter()
+        authors = Counter()
         
-        # Calculate statistics
+        # Calculate statistics in a single pass
         total_size = 0.0
         
         for sf in self.soundfonts:
-            # Instrument type
             if sf.instrument_type:
-                if sf.instrument_type not in stats["instrument_types"]:
-                    stats["instrument_types"][sf.instrument_type] = 0
-                stats["instrument_types"][sf.instrument_type] += 1
-            
-            # Quality
+                instrument_types[sf.instrument_type] += 1
             if sf.quality:
-                if sf.quality not in stats["quality_distribution"]:
-                    stats["quality_distribution"][sf.quality] = 0
-                stats["quality_distribution"][sf.quality] += 1
-            
-            # Genres
-            for genre in sf.genre:
-                if genre not in stats["genres"]:
-                    stats["genres"][genre] = 0
-                stats["genres"][genre] += 1
-            
-            # Tags
-            for tag in sf.tags:
-                if tag not in stats["tags"]:
-                    stats["tags"][tag] = 0
-                stats["tags"][tag] += 1
-            
-            # Authors
+                quality_distribution[sf.quality] += 1
+            genres.update(sf.genre)
+            tags.update(sf.tags)
             if sf.author:
-                if sf.author not in stats["authors"]:
-                    stats["authors"][sf.author] = 0
-                stats["authors"][sf.author] += 1
+                authors[sf.author] += 1
             
             # Size - ensure it's a number
             try:
@@ -868,18 +932,22 @@ class SoundfontManager:
                 # Ignore conversion errors
                 pass
         
+        # Counts are sorted from most to least common
+        stats = {
+            "total_soundfonts": len(self.soundfonts),
+            "instrument_types": dict(instrument_types.most_common()),
+            "quality_distribution": dict(quality_distribution.most_common()),
+            "genres": dict(genres.most_common()),
+            "tags": dict(tags.most_common()),
+            "authors": dict(authors.most_common()),
+            "avg_size_mb": 0.0,
+            "total_size_mb": total_size
+        }
+        
         # Calculate average size
-        stats["total_size_mb"] = total_size
         if stats["total_soundfonts"] > 0:
             stats["avg_size_mb"] = total_size / stats["total_soundfonts"]
         
-        # Sort counts
-        stats["instrument_types"] = dict(sorted(stats["instrument_types"].items(), key=lambda x: x[1], reverse=True))
-        stats["quality_distribution"] = dict(sorted(stats["quality_distribution"].items(), key=lambda x: x[1], reverse=True))
-        stats["genres"] = dict(sorted(stats["genres"].items(), key=lambda x: x[1], reverse=True))
-        stats["tags"] = dict(sorted(stats["tags"].items(), key=lambda x: x[1], reverse=True))
-        stats["authors"] = dict(sorted(stats["authors"].items(), key=lambda x: x[1], reverse=True))
-        
         return stats
     
     def play_soundfont(self, sf: Union[SoundfontMetadata, int], midi_file: Optional[str] = None) -> bool:
@@ -907,9 +975,8 @@ class SoundfontManager:
             print(f"Playing soundfont: {sf_path}")
             print(f"with MIDI file: {midi_file}")
             
-            # Use o método de soundfont_utils para reproduzir
-            from soundfont_utils import run_fluidsynth
-            success = run_fluidsynth(sf_path, midi_file, None)
+            # Use o método de fluidsynth_helper para reproduzir (argv, sem shell)
+            success = fluidsynth_play(sf_path, midi_file)
             
             return success
         
@@ -919,10 +986,10 @@ class SoundfontManager:
         
         finally:
             # Remove temporary MIDI file
-            if temp_midi and midi_file and os.path.exists(midi_file):
+            if temp_midi and midi_file:
                 try:
-                    os.remove(midi_file)
-                except:
+                    os.unlink(midi_file)
+                except OSError:
                     pass
     
     def analyze_soundfont(self, sf_id: int, update_db: bool = True) -> Dict:
@@ -1110,6 +1177,7 @@ class SoundfontManager:
             
             # Update indices and save
             if count > 0:
+                self.dirty = True
                 self._build_indices()
                 self.save_soundfonts()
             
@@ -1,16 +1,18 @@
 import os
 import shutil
 import re
-import numpy as np
-import pretty_midi
 import logging
 import tempfile
-from typing import Dict, List, Optional, Tuple, Set, Any
-from dataclasses import dataclass, asdict, field
-from sf2utils.sf2parse import Sf2File
-import librosa
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Set, Any
+from dataclasses import dataclass, asdict, field, fields
 import hashlib
 
+# sf2utils and numpy are imported where they are used, so that importing this
+# module (e.g. for --help or --scan) doesn't load them
+if TYPE_CHECKING:
+    from sf2utils.sf2parse import Sf2File
+
 # Configure logging to reduce sf2utils warnings
 logging.basicConfig(level=logging.ERROR)  # Only show errors, not warnings
 
@@ -18,6 +20,10 @@ logging.basicConfig(level=logging.ERROR)  # Only show errors, not warnings
 NOTE_NAMES = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
 OCTAVE_RANGE = range(-1, 10)  # From C-1 to B9
 
+# Every capitalization of the soundfont extension, for a case-insensitive
+# str.endswith() without lowercasing each file name
+SF2_SUFFIXES = ('.sf2', '.sF2', '.Sf2', '.SF2')
+
 # MIDI to note name mapping
 MIDI_TO_NOTE = {}
 for octave in OCTAVE_RANGE:
@@ -29,6 +35,14 @@ for octave in OCTAVE_RANGE:
 # Reverse mapping: note name to MIDI number
 NOTE_TO_MIDI = {v: k for k, v in MIDI_TO_NOTE.items()}
 
+# Timbre used when it is not analyzed (or the analysis fails)
+DEFAULT_TIMBRE = {
+    "brightness": "medium",
+    "richness": "medium",
+    "attack": "medium",
+    "harmonic_quality": "balanced"
+}
+
 @dataclass
 class MappedNotes:
     """Information about the note mapping of a soundfont."""
@@ -69,6 +83,33 @@ class SoundfontMetadata:
         if isinstance(result['mapped_notes'], MappedNotes):
             result['mapped_notes'] = result['mapped_notes'].to_dict()
         return result
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SoundfontMetadata':
+        """
+        Create from a dictionary (loaded JSON or analysis results).
+        
+        Unknown keys are ignored and missing ones take the field defaults.
+        
+        Args:
+            data: Dictionary with soundfont metadata
+            
+        Returns:
+            SoundfontMetadata object
+        """
+        kwargs = {name: data[name] for name in _SOUNDFONT_FIELDS if name in data}
+        mapped_notes = kwargs.get('mapped_notes')
+        if isinstance(mapped_notes, dict):
+            kwargs['mapped_notes'] = MappedNotes(
+                **{name: mapped_notes[name] for name in _MAPPED_NOTES_FIELDS if name in mapped_notes}
+            )
+        elif mapped_notes is None:
+            kwargs.pop('mapped_notes', None)
+        return cls(**kwargs)
+
+# Field names, computed once for SoundfontMetadata.from_dict
+_SOUNDFONT_FIELDS = tuple(f.name for f in fields(SoundfontMetadata))
+_MAPPED_NOTES_FIELDS = tuple(f.name for f in fields(MappedNotes))
 
 def decode_safely(value) -> str:
     """
@@ -113,16 +154,13 @@ def extract_sf2_metadata(sf2_path: str) -> Dict:
     Returns:
         Dictionary with extracted metadata
     """
-    # Check if file exists
-    if not os.path.exists(sf2_path):
-        raise FileNotFoundError(f"File not found: {sf2_path}")
-    
-    # Calculate file size in MB - do this outside of try/except to ensure it's captured
+    # Check if file exists; size and last modified time come from the same stat() call
     try:
-        size_mb = os.path.getsize(sf2_path) / (1024 * 1024)
-    except Exception as e:
-        print(f"Warning: Error getting file size: {e}")
-        size_mb = 0.0
+        st = os.stat(sf2_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"File not found: {sf2_path}")
+    size_mb = st.st_size / (1024 * 1024)
+    last_modified = st.st_mtime
     
     # Calculate file hash for quick change identification
     try:
@@ -131,13 +169,6 @@ def extract_sf2_metadata(sf2_path: str) -> Dict:
         print(f"Warning: Error calculating file hash: {e}")
         file_hash = ""
     
-    # Last modified timestamp
-    try:
-        last_modified = os.path.getmtime(sf2_path)
-    except Exception as e:
-        print(f"Warning: Error getting last modified time: {e}")
-        last_modified = 0.0
-    
     # Default metadata
     metadata = {
         "name": os.path.basename(sf2_path).replace('.sf2', ''),
@@ -154,6 +185,8 @@ def extract_sf2_metadata(sf2_path: str) -> Dict:
     }
     
     try:
+        from sf2utils.sf2parse import Sf2File
+        
         # Load SF2 file with sf2utils
         with open(sf2_path, 'rb') as sf2_file:
             sf2 = Sf2File(sf2_file)
@@ -258,7 +291,7 @@ def calculate_file_hash(file_path: str) -> str:
     return sha256_hash.hexdigest()
 
 
-def analyze_note_mapping(sf2: Sf2File) -> MappedNotes:
+def analyze_note_mapping(sf2: "Sf2File") -> MappedNotes:
     """
     Analyze the note mapping in an SF2 file with improved detection.
     
@@ -464,7 +497,7 @@ def analyze_note_mapping(sf2: Sf2File) -> MappedNotes:
         missing_notes=missing_notes
     )
 
-def estimate_polyphony(sf2: Sf2File) -> int:
+def estimate_polyphony(sf2: "Sf2File") -> int:
     """
     Estimate polyphony based on number of instruments and zones.
     
@@ -585,10 +618,7 @@ def analyze_timbre(sf2_path: str, midi_test_file: Optional[str] = None) -> Dict:
     """
     # Default timbre characteristics in case analysis fails
     default_timbre = {
-        "brightness": "medium",
-        "richness": "medium",
-        "attack": "medium",
-        "harmonic_quality": "balanced",
+        **DEFAULT_TIMBRE,
         "spectral_centroid": 0.0,
         "spectral_bandwidth": 0.0,
         "spectral_rolloff": 0.0,
@@ -611,6 +641,9 @@ def analyze_timbre(sf2_path: str, midi_test_file: Optional[str] = None) -> Dict:
         
         # Load the WAV file with librosa
         try:
+            import librosa  # Heavy import, only needed for timbre analysis
+            import numpy as np
+            
             y, sr = librosa.load(actual_wav_path, sr=None)
             
             # Verifique se o áudio contém dados reais
@@ -714,6 +747,8 @@ def create_test_midi(output_file: str = "") -> str:
         os.close(fd)
     
     try:
+        import pretty_midi
+        
         midi = pretty_midi.PrettyMIDI()
         instrument = pretty_midi.Instrument(program=0)  # Piano
         
@@ -761,11 +796,10 @@ def create_test_midi(output_file: str = "") -> str:
     
     except Exception as e:
         print(f"Warning: Error creating test MIDI: {e}")
-        if os.path.exists(output_file):
-            try:
-                os.remove(output_file)
-            except:
-                pass
+        try:
+            os.unlink(output_file)
+        except OSError:
+            pass
         return ""
 
 def extract_tags_from_filename(filename: str) -> List[str]:
@@ -1129,6 +1163,80 @@ def suggest_quality(metadata: Dict) -> str:
     else:
         return "low"
 
+def add_tested_note_range(metadata: Dict, sf2_path: str) -> bool:
+    """
+    Test the playable note range of an SF2 file and store it in its metadata.
+    
+    Args:
+        metadata: Metadata from extract_sf2_metadata, updated in place
+        sf2_path: Path to the .sf2 file
+        
+    Returns:
+        True if the range was tested, False if the test failed
+    """
+    try:
+        min_note, max_note, missing_notes = test_note_range(sf2_path)
+    except Exception as e:
+        print(f"Warning: Error testing note range: {e}")
+        return False
+    
+    mapped_notes = metadata.setdefault("mapped_notes", {})
+    mapped_notes["min_note"] = min_note
+    mapped_notes["max_note"] = max_note
+    mapped_notes["missing_notes"] = missing_notes
+    return True
+
+def analyze_soundfont_full(sf2_path: str, skip_timbre: bool = False, note_range: bool = False,
+                           parallel: bool = True) -> Dict:
+    """
+    Run the whole automatic analysis of an SF2 file in one call.
+    
+    Extracts the technical metadata, optionally tests the playable note range,
+    analyzes the timbre and derives tags, genres and quality from the result, so
+    callers don't chain the steps themselves.
+    
+    Args:
+        sf2_path: Path to the .sf2 file
+        skip_timbre: If True, use the default timbre instead of rendering audio
+        note_range: If True, also test the playable note range (one render per note)
+        parallel: If True, analyze the timbre in a worker thread while the note
+                  range is tested (only when rendering with the FluidSynth
+                  executable; pyfluidsynth renders one at a time)
+        
+    Returns:
+        Dictionary with metadata, timbre, tags, genre and quality
+    """
+    metadata = extract_sf2_metadata(sf2_path)
+    
+    # Both tests spend their time rendering in FluidSynth, so when both run,
+    # timbre analysis goes to a worker thread while the note range is tested.
+    # With pyfluidsynth both render on fluidsynth_helper's shared synth, under
+    # its lock, so they would only take turns: the thread is for subprocesses.
+    timbre_future = None
+    if parallel and note_range and not skip_timbre:
+        from fluidsynth_helper import fluidsynth
+        
+        if fluidsynth is None:
+            executor = ThreadPoolExecutor(max_workers=1)
+            timbre_future = executor.submit(analyze_timbre, sf2_path)
+            executor.shutdown(wait=False)
+    
+    if note_range:
+        add_tested_note_range(metadata, sf2_path)
+    
+    if skip_timbre:
+        metadata["timbre"] = dict(DEFAULT_TIMBRE)
+    elif timbre_future is not None:
+        metadata["timbre"] = timbre_future.result()
+    else:
+        metadata["timbre"] = analyze_timbre(sf2_path)
+    
+    metadata["tags"] = sorted({*metadata.get("tags", []), *generate_tag_suggestions(metadata)})
+    metadata["genre"] = suggest_genres(metadata["timbre"])
+    metadata["quality"] = suggest_quality(metadata)
+    
+    return metadata
+
 def test_note_range(soundfont_path: str, output_dir: Optional[str] = None) -> Tuple[str, str, List[int]]:
     """
     Test a soundfont by playing notes across the MIDI range to detect playable notes.
@@ -1174,7 +1282,7 @@ def test_note_range(soundfont_path: str, output_dir: Optional[str] = None) -> Tu
     # Dictionary to track which notes are playable
     playable_notes = {}
     
-    print(f"\nTesting note range for {os.path.basename(soundfont_path)}...")
+    print(f"\nTesting note range for {os.path.basename(soundfont_path)}...", flush=True)
     
     # Test each note
     for note in test_notes:
@@ -1298,13 +1406,13 @@ def test_note_range(soundfont_path: str, output_dir: Optional[str] = None) -> Tu
         missing_note_names = [MIDI_TO_NOTE.get(n, f"Unknown-{n}") for n in sorted(missing_notes)]
         
         if missing_note_names:
-            print(f"Missing notes: {', '.join(missing_note_names)}")
+            print(f"Missing notes: {', '.join(missing_note_names)}", flush=True)
         else:
-            print("No missing notes detected within the range.")
+            print("No missing notes detected within the range.", flush=True)
         
         return min_note, max_note, missing_note_names
     else:
-        print("No playable notes detected.")
+        print("No playable notes detected.", flush=True)
         return "C4", "C4", []  # Default fallback
     
     # Clean up temporary files if needed